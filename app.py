@@ -5,8 +5,12 @@ import re
 import base64
 import io
 import plotly.express as px
-from nselib import derivatives
-import pandas_market_calendars as mcal
+from utils.tokens import run_analysis
+from utils.bhavcopy_cache import get_bhavcopy, get_instruments
+from utils.instruments import build_instrument_index
+from utils.bhavcopy_loader import load_bhavcopy_csv
+from utils.trading_calendar import is_trading_day
+from utils.token_store import save_token_set, previous_token_set, diff_tokens, diff_text, is_bhavcopy_for
 
 st.title("STOCK CR TOKEN")
 st.write("This app generates stock cr token.")
@@ -18,82 +22,8 @@ page = st.sidebar.radio("Select Page", ["Stock CR Token"])
 # Session State
 if "fallback_data" not in st.session_state:
     st.session_state.fallback_data = None
-
-# Function to check trading day
-def is_trading_day(date):
-    nse = mcal.get_calendar("NSE")
-    schedule = nse.schedule(start_date=date, end_date=date)
-    return not schedule.empty
-
-# Main logic function
-def run_analysis(date_str, month, oi_threshold, atm_percentage, fallback_data, sort_ascending=True):
-    try:
-        data = fallback_data.copy()
-
-        data = data[data["FinInstrmNm"].str.contains(month)].copy()
-        if data.empty:
-            return None, f"No contracts found for {month}."
-
-        data["open_int"] = data["OpnIntrst"] / data["NewBrdLotQty"]
-        fut = data[data["FinInstrmNm"].str.contains(f"{month}FUT")].copy()
-        FUT = fut["FinInstrmNm"].copy()
-
-        mask = (
-            ((data["StrkPric"] >= data["UndrlygPric"]) & (data["OptnTp"] == "PE"))
-            | ((data["StrkPric"] <= data["UndrlygPric"]) & (data["OptnTp"] == "CE"))
-        )
-        df = data[mask].copy()
-        if df.empty:
-            return None, "No matching data after applying filters."
-
-        atm_decimal = atm_percentage / 100
-        df["atm_con"] = df.apply(
-            lambda row: "True"
-            if (
-                row["StrkPric"] <= row["UndrlygPric"] - (atm_decimal * row["UndrlygPric"])
-                or row["StrkPric"] >= row["UndrlygPric"] + (atm_decimal * row["UndrlygPric"])
-            )
-            else "False",
-            axis=1,
-        )
-
-        mask01 = df[df["atm_con"] == "True"]
-        mask01 = mask01[mask01["open_int"] > oi_threshold]
-        mask02 = df[df["atm_con"] == "False"]
-        df1 = pd.merge(mask01, mask02, how="outer")
-
-        if df1.empty:
-            return None, "No data after applying OI threshold filter."
-
-        df2 = pd.DataFrame(df1["FinInstrmNm"])
-        df2["copy_fin"] = df2["FinInstrmNm"].str[:-2] + "PE"
-        df2["FinInstrmNm"] = df2["FinInstrmNm"].str[:-2] + "CE"
-        df2["FinInstrmNm"] = "NRML|" + df2["FinInstrmNm"]
-        df2["copy_fin"] = "NRML|" + df2["copy_fin"]
-
-        if not FUT.empty:
-            FUT_df = pd.DataFrame({"fut": "NRML|" + FUT})
-        else:
-            FUT_df = pd.DataFrame({"fut": []})
-
-        ce_df = pd.DataFrame({"All Columns": df2["FinInstrmNm"]})
-        pe_df = pd.DataFrame({"All Columns": df2["copy_fin"]})
-        fut_df = pd.DataFrame({"All Columns": FUT_df["fut"]})
-        df_combined = pd.concat([ce_df, pe_df, fut_df], ignore_index=True)
-        df_filtered = df_combined[~df_combined["All Columns"].str.contains("NIFTY", na=False)].copy()
-
-        mask = pd.Series(False, index=df_filtered.index)
-        for col in df_filtered.columns:
-            if df_filtered[col].dtype == object:
-                mask |= df_filtered[col].str.contains("\.", na=False)
-        df5 = df_filtered[~mask]
-        df5 = df5.sort_values(by="All Columns", ascending=sort_ascending)
-
-        return df5, None
-
-    except Exception as e:
-        return None, f"Error: {str(e)}"
-
+    st.session_state.fallback_instruments = None
+    st.session_state.fallback_key = None
 
 # Sidebar: Input Parameters
 derivatives_sidebar = st.sidebar.expander("Token Parameters", expanded=True)
@@ -107,13 +37,25 @@ with derivatives_sidebar:
     oi_threshold = st.number_input("OI Threshold", min_value=0, value=0)
     atm_percentage = st.slider("ATM Range Percentage", min_value=1, max_value=20, value=8)
     sort_ascending = st.checkbox("Sort Ascending", value=True)
+    diff_mode = st.checkbox("Diff vs Previous Trading Day", value=False,
+                            help="Also show only the tokens added/removed since the previous trading day")
 
 # File uploader always visible (persistent across reruns)
 uploaded_file = st.file_uploader("Upload Bhavcopy (CSV format only)", type=["csv"])
-if uploaded_file:
+if uploaded_file and st.session_state.fallback_key != (uploaded_file.name, uploaded_file.size):
     try:
-        st.session_state.fallback_data = pd.read_csv(uploaded_file)
+        st.session_state.fallback_data, load_stats = load_bhavcopy_csv(uploaded_file)
+        # Parse FinInstrmNm once per upload, every Generate Token click reuses it
+        st.session_state.fallback_instruments = build_instrument_index(st.session_state.fallback_data)
+        st.session_state.fallback_key = (uploaded_file.name, uploaded_file.size)
         st.success("File uploaded successfully and stored in session.")
+        load_caption = (
+            f"Parsed {load_stats['rows']:,} rows in {load_stats['seconds']:.2f}s, "
+            f"{load_stats['frame_bytes'] / 1e6:.1f} MB frame"
+        )
+        if load_stats["rss_bytes"] is not None:
+            load_caption += f", {load_stats['rss_bytes'] / 1e6:.0f} MB process resident memory"
+        st.caption(load_caption)
     except Exception as e:
         st.error(f"Error reading uploaded file: {e}")
 
@@ -123,9 +65,10 @@ if st.button("Generate Token"):
         st.warning(f"Selected date ({date}) may not be a trading day.")
 
     date_str = date.strftime("%Y-%m-%d")
-    formatted_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").strftime("%d-%m-%Y")
 
     result_df, error = None, None
+    # Token sets are stored per date, so only keep ones built from that date's Bhavcopy
+    from_selected_date = False
 
     if st.session_state.fallback_data is not None:
         # Use uploaded file if available
@@ -133,18 +76,23 @@ if st.button("Generate Token"):
             result_df, error = run_analysis(
                 date_str, selected_month, oi_threshold, atm_percentage,
                 fallback_data=st.session_state.fallback_data,
-                sort_ascending=sort_ascending
+                sort_ascending=sort_ascending,
+                instruments=st.session_state.fallback_instruments
             )
+        from_selected_date = is_bhavcopy_for(st.session_state.fallback_data, date)
     else:
         # Otherwise, fetch NSE data
         try:
             with st.spinner("Fetching data from NSE..."):
-                data = derivatives.fno_bhav_copy(formatted_date)
+                data = get_bhavcopy(date)
+                instruments = get_instruments(date)
             result_df, error = run_analysis(
                 date_str, selected_month, oi_threshold, atm_percentage,
                 fallback_data=data,
-                sort_ascending=sort_ascending
+                sort_ascending=sort_ascending,
+                instruments=instruments
             )
+            from_selected_date = True
         except FileNotFoundError:
             st.warning("Data not found for the selected date. Please upload the file manually.")
 
@@ -152,6 +100,16 @@ if st.button("Generate Token"):
         st.error(error)
     elif result_df is not None:
         st.success("Token Generated successfully!")
+        if from_selected_date:
+            save_token_set(date, selected_month, oi_threshold, atm_percentage, result_df["All Columns"].tolist())
+
+        diff_df = None
+        if diff_mode:
+            prev_date, prev_tokens = previous_token_set(date, selected_month, oi_threshold, atm_percentage)
+            if prev_tokens is None:
+                st.warning(f"No token set available for the previous trading day ({prev_date}), diff skipped.")
+            else:
+                diff_df = diff_tokens(result_df["All Columns"], prev_tokens, sort_ascending=sort_ascending)
 
         # Count types
         futures_count = result_df["All Columns"].str.contains("FUT$", regex=True).sum()
@@ -162,9 +120,15 @@ if st.button("Generate Token"):
         st.subheader("Show Token")
         st.dataframe(result_df)
 
+        if diff_df is not None:
+            added = (diff_df["Change"] == "added").sum()
+            st.subheader(f"Changes since {prev_date}")
+            st.write(f"Added: {added} | Removed: {len(diff_df) - added}")
+            st.dataframe(diff_df)
+
         # Download
         st.subheader("Download Options")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
 
         with col1:
             csv = result_df.to_csv(index=False).encode("utf-8")
@@ -185,6 +149,15 @@ if st.button("Generate Token"):
                 mime="text/plain"
             )
 
+        with col3:
+            if diff_df is not None:
+                st.download_button(
+                    label="Download Diff",
+                    data=diff_text(diff_df).encode("utf-8"),
+                    file_name=f"stock_crtoken_{date_str}_{selected_month}_diff.txt",
+                    mime="text/plain"
+                )
+
         # Summary
         st.subheader("Summary")
         st.write(f"Total tokens: {len(result_df)}")
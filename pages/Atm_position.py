@@ -1,7 +1,9 @@
-import pandas as pd
 import streamlit as st
 import openpyxl
 
+from utils.positions import atm_positions, ATM_COLUMNS
+from utils.pos_reader import read_pos
+
 # Title and Header
 st.title("AT Money Position")
 st.header("Upload POS File (Excel)")
@@ -35,7 +37,8 @@ else:
 def parse_pos_contents(file, atm_value, mode):
     try:
         # Read file
-        data = pd.read_excel(file, header=1, index_col=0)
+        # Parsed once per file content and shared with the position matching page
+        data = read_pos(file.getvalue(), header=1, index_col=0)
         st.success("Successfully read POS file!")
 
         # Required columns check
@@ -44,45 +47,12 @@ def parse_pos_contents(file, atm_value, mode):
             st.error(f"Missing required columns: {required_columns - set(data.columns)}")
             return None
 
-        # Filter active positions
-        data = data[data['Net Qty'] != 0]
-
-        # Separate Futures and Options
-        fut = data[data['Call/Put'] == 'FF']
-        opt = data[data['Call/Put'] != 'FF']
-
-        # Empty ATM DataFrame
-        ATM = pd.DataFrame(columns=opt.columns)
-
-        # Loop through options
-        for _, row in opt.iterrows():
-            matching_fut = fut[fut['Scrip'] == row['Scrip']]
-
-            if not matching_fut.empty:
-                ltp_value = matching_fut['LTP'].values[0]
-
-                # Threshold calculation
-                if mode == "Absolute Range":
-                    threshold = atm_value
-                else:
-                    threshold = ltp_value * (atm_value / 100)
-
-                # ATM condition
-                if abs(row['STK'] - ltp_value) < threshold:
-
-                    # OTM logic (your original condition preserved)
-                    if (
-                        (row['STK'] < ltp_value and row['Call/Put'] == 'CE') or
-                        (row['STK'] > ltp_value and row['Call/Put'] == 'PE')
-                    ):
-                        ATM = pd.concat(
-                            [ATM, pd.DataFrame([row.values], columns=ATM.columns)],
-                            ignore_index=True
-                        )
+        # OTM options near their future's LTP, in one vectorized pass
+        ATM = atm_positions(data, atm_value, mode)
 
         # Display Results
         if not ATM.empty:
-            ATM = ATM[['Scrip', 'Call/Put', 'Exp Date', 'STK', 'Net Qty']]
+            ATM = ATM[ATM_COLUMNS]
 
             with st.expander("At Money Position", expanded=True):
                 st.dataframe(ATM)
@@ -2,13 +2,20 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import datetime as dt
-from nselib import derivatives, capital_market
 import plotly.express as px
 import logging
 import traceback
-import yfinance as yf
-import concurrent.futures
+import time
 import pytz
+from utils.bhavcopy_cache import get_cube
+from utils.aggregates import build_cube, symbol_totals, strike_values
+from utils.trading_calendar import trading_days
+from utils.prefetch import prefetch_bhavcopies
+from utils.bhav_store import get_store
+from utils.universe import get_fno_symbols
+from utils.live_scanner import scan_option_chains, Rankings
+from utils.oi_matrix import StrikeDateMatrix, matrix_path
+from utils.chart_data import drop_empty_strikes, limit_frames, format_payload, HEATMAP_COLUMN_BUDGET, PAYLOAD_DEBUG
 
 st.set_page_config(layout="wide", page_title="Bhavcopy Dashboard")
 
@@ -16,7 +23,7 @@ st.title("📈 NSE F&O Bhavcopy Dashboard")
 
 # Sidebar inputs
 st.sidebar.header("Input Parameters")
-stock_list = list(capital_market.fno_equity_list()['symbol'])
+stock_list = get_fno_symbols()
 
 selected_value_parameter = st.sidebar.selectbox(
     "Select Metric for Traded Value Calculation",
@@ -38,32 +45,13 @@ with tab1:
     st.subheader(f"Top Stocks by Traded Value on {date_str}")
     
     try:
-        data = derivatives.fno_bhav_copy(date_str)
+        # Per symbol x expiry x strike x option totals for all three metrics, built once per day
+        cube = get_cube(selected_date)
     except Exception as e:
         st.error(f"Failed to fetch bhavcopy: {e}")
         st.stop()
-    # Define total_traded_value calculation logic
-    def calculate_traded_value(df, method):
-        if method == "Volume":
-            return df['TtlTradgVol'] * df['NewBrdLotQty'] * df['SttlmPric']
-        elif method == "Open Interest":
-            return df['OpnIntrst'] * df['SttlmPric']
-        elif method == "Change in OI":
-            return df['ChngInOpnIntrst'] * df['SttlmPric']
-        else:
-            return df['TtlTradgVol'] * df['NewBrdLotQty'] * df['SttlmPric']
-    
-    
-
-
-    data = data.dropna(subset=['StrkPric', 'OptnTp'])
-    data['total_traded_value'] = calculate_traded_value(data, selected_value_parameter)
-    data = data[data['XpryDt'] == expiry_str]
-
-    
-    data = data[data['TckrSymb'].isin(stock_list)]
 
-    traded_val_df = data.groupby('TckrSymb')['total_traded_value'].sum().reset_index()
+    traded_val_df = symbol_totals(cube, selected_value_parameter, expiry=expiry_str, symbols=stock_list)
     traded_val_df['total_traded_value'] = traded_val_df['total_traded_value'] / 1e7  # in ₹ Cr
     top_n = traded_val_df.sort_values('total_traded_value', ascending=False).head(30)
 
@@ -83,8 +71,7 @@ with tab1:
     
 
     
-    stock_df = data[data['TckrSymb'] == stock]
-    grouped_df = stock_df.groupby(['StrkPric', 'OptnTp'])['total_traded_value'].sum().reset_index()
+    grouped_df = strike_values(cube, selected_value_parameter, stock, expiry=expiry_str)
     grouped_df['total_traded_value'] = grouped_df['total_traded_value'] / 1e7
 
     fig = px.bar(grouped_df, x='StrkPric', y='total_traded_value', color='OptnTp',
@@ -97,23 +84,64 @@ with tab2:
 
     collected_data = []
     strike_data = []
-    oi_change_data =[]
-    date_range = pd.date_range(start=selected_start_date, end=dt.date.today())
-    for date in date_range:
-        try:
-            d = derivatives.fno_bhav_copy(date.strftime('%d-%m-%Y'))
-            daily_cls = d[(d['TckrSymb']==stock_to_track)&(d['XpryDt']==expiry_str)&(d['FinInstrmNm'].str.contains('FUT'))]['ClsPric'].iloc[0]
-            d = d.dropna(subset=['StrkPric', 'OptnTp'])
-            d = d[(d['TckrSymb'] == stock_to_track) & (d['XpryDt'] == expiry_str)].copy()
-            d['total_traded_value'] = calculate_traded_value(d, selected_value_parameter)
-            total_val = d['total_traded_value'].sum()
-            collected_data.append((date.strftime('%d-%m-%Y'), total_val,daily_cls))
-            strike_data.append(d)
-            d = d[['StrkPric', 'OptnTp', 'total_traded_value']].copy()
-            d['date'] = date.strftime('%Y-%m-%d')
-            oi_change_data.append(d)
-        except:
-            continue
+    oi_change_data = {}
+    failed_days = []
+
+    def add_trend_day(date, d):
+        fut_rows = d[(d['TckrSymb']==stock_to_track)&(d['XpryDt']==expiry_str)&(d['FinInstrmNm'].str.contains('FUT'))]
+        if fut_rows.empty:
+            failed_days.append((date.strftime('%d-%m-%Y'), f"No {stock_to_track} future expiring {expiry_str}"))
+            return
+        daily_cls = fut_rows['ClsPric'].iloc[0]
+        cube = build_cube(d[(d['TckrSymb'] == stock_to_track) & (d['XpryDt'] == expiry_str)])
+        d = strike_values(cube, selected_value_parameter, stock_to_track)
+        total_val = d['total_traded_value'].sum()
+        collected_data.append((date.strftime('%d-%m-%Y'), total_val,daily_cls))
+        d['TradDt'] = date.strftime('%Y-%m-%d')
+        strike_data.append(d)
+        oi_change_data[date.strftime('%Y-%m-%d')] = d[['StrkPric', 'OptnTp', 'total_traded_value']]
+
+    date_range = trading_days(selected_start_date, dt.date.today())
+    store = get_store()
+    missing_days = store.missing(date_range)
+
+    # Days already in the store: one symbol/expiry query with predicate pushdown
+    if len(date_range) > len(missing_days):
+        stored = store.query(stock_to_track, expiry_str, date_range[0], date_range[-1])
+        stored_days = {pd.Timestamp(day) for day in stored['date'].unique()}
+        for day, d in stored.groupby('date', sort=True):
+            add_trend_day(pd.Timestamp(day), d)
+        for day in date_range:
+            if day not in missing_days and day not in stored_days:
+                failed_days.append((day.strftime('%d-%m-%Y'), f"No {stock_to_track} contracts expiring {expiry_str}"))
+
+    # New days: download concurrently, add them to the store and preview the trend as they arrive
+    if missing_days:
+        progress = st.progress(0.0, text="Fetching bhavcopies...")
+        live_chart = st.empty()
+        for i, (date, d, error) in enumerate(prefetch_bhavcopies(missing_days), start=1):
+            progress.progress(i / len(missing_days), text=f"Fetched {i}/{len(missing_days)} days")
+            if error:
+                failed_days.append((date.strftime('%d-%m-%Y'), error))
+                continue
+            try:
+                if date < dt.date.today():  # today's file is not final yet
+                    store.ingest(date, d)
+                add_trend_day(pd.Timestamp(date), d)
+                live_df = pd.DataFrame(collected_data, columns=['date', 'total_traded_value', 'daily_close'])
+                live_df['date'] = pd.to_datetime(live_df['date'], format='%d-%m-%Y')
+                live_chart.line_chart(live_df.set_index('date').sort_index()['total_traded_value'] / 1e7)
+            except Exception as e:
+                failed_days.append((date.strftime('%d-%m-%Y'), f"{type(e).__name__}: {e}"))
+        progress.empty()
+        live_chart.empty()
+
+    if failed_days:
+        with st.expander(f"⚠️ {len(failed_days)} day(s) could not be loaded"):
+            st.dataframe(pd.DataFrame(failed_days, columns=['date', 'reason']), use_container_width=True)
+
+    # Downloaded days arrive in completion order
+    collected_data.sort(key=lambda row: dt.datetime.strptime(row[0], '%d-%m-%Y'))
 
     trend_df = pd.DataFrame(collected_data, columns=['date', 'total_traded_value','daily_close'])
     trend_df['total_traded_value'] = trend_df['total_traded_value'] / 1e7
@@ -150,6 +178,10 @@ with tab2:
         strike_df = pd.concat(strike_data)
         strike_df['total_traded_value'] = strike_df['total_traded_value'] / 1e7
         strike_df['TradDt'] = pd.to_datetime(strike_df['TradDt'])
+        strike_df = strike_df.sort_values('TradDt')
+        # Far-OTM strikes with no value on any day only widen the axis, and long
+        # ranges are sampled down to a frame budget to keep the payload small
+        strike_df = limit_frames(drop_empty_strikes(strike_df, 'total_traded_value'), 'TradDt')
 
         fig_anim = px.bar(strike_df, x='StrkPric', y='total_traded_value', color='OptnTp',
                           animation_frame=strike_df['TradDt'].dt.strftime('%d-%m-%Y'),
@@ -157,103 +189,97 @@ with tab2:
                           title=f'{stock_to_track} - Strike vs Traded Value Over Time',
                           labels={'StrkPric': 'Strike', 'total_traded_value': '₹ Cr'})
         st.plotly_chart(fig_anim, use_container_width=True)
+        if PAYLOAD_DEBUG:
+            st.caption(format_payload(fig_anim))
     else:
         st.info("No strike-wise data available for animation.")
 
-       
-    oi_df = pd.concat(oi_change_data)
-    
-    # Pivot data: rows = date, columns = (Strike, Option Type), values = OI
-    pivoted_oi = oi_df.pivot_table(index='date', columns=['StrkPric', 'OptnTp'], values='total_traded_value')
-    pivoted_oi = pivoted_oi.sort_index()
 
-    oi_pct_change = pivoted_oi.pct_change() * 100
-    oi_pct_change = oi_pct_change.round(2)
+    # Persistent strike x date matrix for this symbol/expiry/metric: only days it
+    # has not seen yet are added, each with just its own % change computed
+    matrix_dir = matrix_path(stock_to_track, expiry_str, selected_value_parameter)
+    oi_matrix = StrikeDateMatrix.load(matrix_dir)
+    today_str = dt.date.today().strftime('%Y-%m-%d')
+    new_days = sorted(day for day in oi_change_data if day not in oi_matrix.dates and day < today_str)
+    for day in new_days:
+        oi_matrix.add_day(day, oi_change_data[day])
+    if new_days:
+        oi_matrix.save(matrix_dir)
+    if today_str in oi_change_data:  # today's file is not final, keep it out of the saved matrix
+        oi_matrix = oi_matrix.copy().add_day(today_str, oi_change_data[today_str])
+
+    if oi_change_data:
+        heat_start, heat_end = min(oi_change_data), max(oi_change_data)
 
         # Filter for Calls
-    calls_change = oi_pct_change.xs('CE', axis=1, level=1, drop_level=False)
-    calls_change_T = calls_change.T
-    calls_change_T.index = calls_change_T.index.get_level_values(0)  # Extract only StrkPric
+        calls_change_T = oi_matrix.heatmap('CE', heat_start, heat_end, max_columns=HEATMAP_COLUMN_BUDGET)
     
-    fig_calls = px.imshow(
-        calls_change_T,
-        aspect='auto',
-        color_continuous_scale='RdBu',
-        zmin=-100, zmax=100,
-        labels=dict(x="Date", y="Strike", color="% Change"),
-        title=f"{stock_to_track} - % Change in Traded Value (Calls)"
-    )
-    st.plotly_chart(fig_calls, use_container_width=True)
-    # Filter for Puts
-    puts_change = oi_pct_change.xs('PE', axis=1, level=1, drop_level=False)
-    puts_change_T = puts_change.T
-    puts_change_T.index = puts_change_T.index.get_level_values(0)  # Extract only StrkPric
+        fig_calls = px.imshow(
+            calls_change_T,
+            aspect='auto',
+            color_continuous_scale='RdBu',
+            zmin=-100, zmax=100,
+            labels=dict(x="Date", y="Strike", color="% Change"),
+            title=f"{stock_to_track} - % Change in Traded Value (Calls)"
+        )
+        st.plotly_chart(fig_calls, use_container_width=True)
+        if PAYLOAD_DEBUG:
+            st.caption(format_payload(fig_calls))
+        # Filter for Puts
+        puts_change_T = oi_matrix.heatmap('PE', heat_start, heat_end, max_columns=HEATMAP_COLUMN_BUDGET)
     
-    fig_puts = px.imshow(
-        puts_change_T,
-        aspect='auto',
-        color_continuous_scale='RdBu',
-        zmin=-100, zmax=100,
-        labels=dict(x="Date", y="Strike", color="% Change "),
-        title=f"{stock_to_track} - % Change in Traded Value (Puts)"
-    )
-    st.plotly_chart(fig_puts, use_container_width=True)
+        fig_puts = px.imshow(
+            puts_change_T,
+            aspect='auto',
+            color_continuous_scale='RdBu',
+            zmin=-100, zmax=100,
+            labels=dict(x="Date", y="Strike", color="% Change "),
+            title=f"{stock_to_track} - % Change in Traded Value (Puts)"
+        )
+        st.plotly_chart(fig_puts, use_container_width=True)
+        if PAYLOAD_DEBUG:
+            st.caption(format_payload(fig_puts))
+    else:
+        st.info("No strike-wise data available for heatmaps.")
 
 with tab3:
     st.subheader("Top 10 Stocks by Traded Value in Calls & Puts (Live Option Chain)")
 
-    def get_ltp(stock):
-        try:
-            stock_full = stock.upper() + '.NS'
-            data = yf.Ticker(stock_full).get_info()
-            return data.get('currentPrice') or data.get('regularMarketPrice')
-        except Exception as e:
-            return None
-
-    def process_stock(stock):
-        try:
-            ltp = get_ltp(stock)
-            if ltp is None:
-                return None, None
-            data = derivatives.nse_live_option_chain(stock)
-            lot_size = data[data['CALLS_Ask_Qty'] != 0]['CALLS_Ask_Qty'].min()
-            lot_size = 1 if pd.isna(lot_size) or lot_size == 0 else lot_size
-            data['Lot_Size'] = lot_size
-            calls = data[data['Strike_Price'] <= ltp].copy()
-            puts = data[data['Strike_Price'] >= ltp].copy()
-            return calls, puts
-        except Exception as e:
-            return None, None
+    def draw_rankings(rankings):
+        top_calls = rankings.top_calls(10)
+        fig_call = px.bar(top_calls, x='Symbol', y='CALLS_Trade_Value',
+                          title='Top 10 Stocks by CALL Traded Value (₹ Cr)',
+                          labels={'CALLS_Trade_Value': '₹ Cr'}, color_discrete_sequence=['green'])
+        call_chart.plotly_chart(fig_call, use_container_width=True)
+
+        top_puts = rankings.top_puts(10)
+        fig_put = px.bar(top_puts, x='Symbol', y='PUTS_Trade_Value',
+                         title='Top 10 Stocks by PUT Traded Value (₹ Cr)',
+                         labels={'PUTS_Trade_Value': '₹ Cr'}, color_discrete_sequence=['red'])
+        put_chart.plotly_chart(fig_put, use_container_width=True)
 
     if st.button("Run Live Analysis"):
-        with st.spinner("Fetching live option data..."):
-            stocks = stock_list
-            result_call, result_put = [], []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                results = list(executor.map(process_stock, stocks))
-            for calls, puts in results:
-                if calls is not None:
-                    result_call.append(calls)
-                if puts is not None:
-                    result_put.append(puts)
-
-            if result_call:
-                df_call = pd.concat(result_call)
-                df_call['CALLS_Trade_Value'] = df_call['CALLS_Volume'] * df_call['CALLS_LTP'] * df_call['Lot_Size']
-                top_calls = df_call.groupby('Symbol')['CALLS_Trade_Value'].sum().sort_values(ascending=False).head(10).reset_index()
-                fig_call = px.bar(top_calls, x='Symbol', y='CALLS_Trade_Value',
-                                  title='Top 10 Stocks by CALL Traded Value (₹ Cr)',
-                                  labels={'CALLS_Trade_Value': '₹ Cr'}, color_discrete_sequence=['green'])
-                st.plotly_chart(fig_call, use_container_width=True)
-
-            if result_put:
-                df_put = pd.concat(result_put)
-                df_put['PUTS_Trade_Value'] = df_put['PUTS_Volume'] * df_put['PUTS_LTP'] * df_put['Lot_Size']
-                top_puts = df_put.groupby('Symbol')['PUTS_Trade_Value'].sum().sort_values(ascending=False).head(10).reset_index()
-                fig_put = px.bar(top_puts, x='Symbol', y='PUTS_Trade_Value',
-                                 title='Top 10 Stocks by PUT Traded Value (₹ Cr)',
-                                 labels={'PUTS_Trade_Value': '₹ Cr'}, color_discrete_sequence=['red'])
-                st.plotly_chart(fig_put, use_container_width=True)
+        progress = st.progress(0.0, text="Fetching live option data...")
+        call_chart, put_chart = st.empty(), st.empty()
+        rankings = Rankings()
+        failed = []
+        last_draw = 0.0
+        for i, (symbol, call_values, put_values, error) in enumerate(scan_option_chains(stock_list), start=1):
+            progress.progress(i / len(stock_list), text=f"Scanned {i}/{len(stock_list)} symbols")
+            if error:
+                failed.append((symbol, error))
+                continue
+            rankings.add(call_values, put_values)
+            # Redraw the rankings at most once a second while symbols stream in
+            if time.monotonic() - last_draw > 1.0:
+                draw_rankings(rankings)
+                last_draw = time.monotonic()
+        progress.empty()
+        draw_rankings(rankings)
+
+        if failed:
+            with st.expander(f"⚠️ {len(failed)} symbol(s) skipped"):
+                st.dataframe(pd.DataFrame(failed, columns=['symbol', 'reason']), use_container_width=True)
 
         ist = pytz.timezone('Asia/Kolkata')
         st.caption(f"Updated at: {pd.Timestamp.now(tz=ist).strftime('%Y-%m-%d %H:%M:%S IST')}")
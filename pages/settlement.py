@@ -4,7 +4,7 @@ import pytz
 import datetime
 import time
 import pandas as pd
-from nselib import capital_market
+from utils.universe import get_fno_symbols
 
 # -------------------------
 # Streamlit App Layout
@@ -19,7 +19,7 @@ st.write("This app fetches live data from TradingView and calculates VWAP for th
 # -------------------------
 #username = st.text_input("TradingView Username", type="default")
 #password = st.text_input("TradingView Password", type="password")
-stock_list = list(capital_market.fno_equity_list()['symbol'])
+stock_list = get_fno_symbols()
 stock_name = st.selectbox("Enter Stock Symbol (e.g., 'UPL')",options=stock_list)
 market = st.selectbox("Select Market", ["NSE", "BSE"], index=0)
 
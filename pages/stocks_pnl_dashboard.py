@@ -1,141 +1,9 @@
 import streamlit as st
 import pandas as pd
-import zipfile
-import io
 import plotly.express as px
-
-# -------------------------
-# Helper: process single file
-# -------------------------
-def process_file_content(file_bytes):
-    try:
-        data = pd.read_csv(
-            io.BytesIO(file_bytes),
-            header=None,
-            names=[
-                'abc','bce','symbol','cont_typ','expiry','strike','inst_type','inst_name','cef',
-                'efd','id','efg','buy_sell','quantity','price','ghi','mod','id_2','hij',
-                'datetime','datetime_02','xyz','pqr','stu','tqp','qwe'
-            ],
-            dtype=str,
-            engine="python",
-            on_bad_lines="skip"
-        )
-    except Exception as e:
-        st.error(f"Failed to parse file: {e}")
-        return pd.DataFrame()
-
-    cols = ['symbol','cont_typ','expiry','strike','inst_type','inst_name','id',
-            'buy_sell','quantity','price','id_2','datetime','datetime_02']
-    for c in cols:
-        if c not in data.columns:
-            data[c] = pd.NA
-
-    df = data[cols].copy()
-
-    df['inst_type'] = df['inst_type'].astype(str).str.strip().str.upper()
-    df['buy_sell'] = pd.to_numeric(df['buy_sell'], errors='coerce').fillna(0).astype(int)
-    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).astype(int)
-    df['price'] = pd.to_numeric(df['price'], errors='coerce')
-    df['strike'] = pd.to_numeric(df['strike'], errors='coerce')
-
-    df['date_str'] = df['datetime_02'].astype(str).str.extract(r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{4})', expand=False)
-    df['date'] = pd.to_datetime(df['date_str'], format="%d %b %Y", errors='coerce')
-
-    collected_data = []
-
-    for expiry in df['expiry'].dropna().unique():
-        mask1 = df[df['expiry'] == expiry].copy()
-        if mask1.empty:
-            continue
-
-        mask = mask1.groupby(['symbol','expiry','inst_type','buy_sell'], dropna=False).agg({
-            'date': 'first',
-            'strike': 'mean',
-            'quantity': 'sum',
-            'price': 'mean',
-        }).reset_index()
-
-        stock_list = mask['symbol'].dropna().unique()
-
-        for stock in stock_list:
-            data_stock = mask[mask['symbol'] == stock].copy()
-            if data_stock.empty:
-                continue
-
-            xx_data = data_stock[data_stock['inst_type'] == 'XX']
-            if xx_data.empty:
-                continue
-
-            for _, row in xx_data.iterrows():
-                trade = None
-                parity = None
-                expense = None
-                net_quantity = 0
-
-                try:
-                    if row['buy_sell'] == 2:  # OPEN
-                        ce_row = data_stock[(data_stock['inst_type']=='CE') & (data_stock['buy_sell']==1)]
-                        pe_row = data_stock[(data_stock['inst_type']=='PE') & (data_stock['buy_sell']==2)]
-
-                        if ce_row.empty or pe_row.empty:
-                            continue
-
-                        ce_price = float(ce_row['price'].iloc[0])
-                        pe_price = float(pe_row['price'].iloc[0])
-                        ce_strike = float(ce_row['strike'].iloc[0])
-
-                        parity = round(abs(ce_price - pe_price - float(row['price'])) - ce_strike, 2)
-                        trade = "open"
-                        net_quantity = int(pe_row['quantity'].iloc[0])
-
-                        expense = round(
-                            (ce_price * 0.00055) +
-                            (pe_price * 0.001625) +
-                            (float(row['price']) * 0.00028118), 2
-                        )
-
-                    else:  # CLOSE
-                        ce_row = data_stock[(data_stock['inst_type']=='CE') & (data_stock['buy_sell']==2)]
-                        pe_row = data_stock[(data_stock['inst_type']=='PE') & (data_stock['buy_sell']==1)]
-
-                        if ce_row.empty or pe_row.empty:
-                            continue
-
-                        ce_price = float(ce_row['price'].iloc[0])
-                        pe_price = float(pe_row['price'].iloc[0])
-                        ce_strike = float(ce_row['strike'].iloc[0])
-
-                        parity = round(-abs(-ce_price + pe_price + float(row['price'])) + ce_strike, 2)
-                        trade = "close"
-                        net_quantity = int(pe_row['quantity'].iloc[0])
-
-                        expense = round(
-                            (ce_price * 0.001625) +
-                            (pe_price * 0.00055) +
-                            (float(row['price']) * 0.00005618), 2
-                        )
-
-                    collected_data.append({
-                        'date': row['date'] if not pd.isna(row['date']) else mask1['date'].iloc[0] if not mask1['date'].isna().all() else pd.NaT,
-                        'expiry': expiry,
-                        'stock': stock,
-                        'net_quantity': net_quantity,
-                        'trade': trade,
-                        'parity': parity,
-                        'expense': expense
-                    })
-                except Exception:
-                    continue
-
-    df_out = pd.DataFrame(collected_data)
-    if df_out.empty:
-        return df_out
-
-    df_out['pnl'] = (df_out['parity'] - df_out['expense']) * df_out['net_quantity']
-    df_out['date'] = pd.to_datetime(df_out['date'], errors='coerce')
-    df_out['expiry'] = pd.to_datetime(df_out['expiry'], format="%d %b %Y", errors='coerce')
-    return df_out
+from utils.trade_archive import trade_file_names, ingest_trade_files, combine_results
+from utils.trade_ledger import get_ledger
+from utils.chart_data import decimate, format_payload, WEBGL_THRESHOLD, PAYLOAD_DEBUG
 
 # -------------------------
 # STREAMLIT UI
@@ -155,35 +23,44 @@ final_df = pd.DataFrame()
 if uploaded_files:
     st.success(f"{len(uploaded_files)} file(s) uploaded")
 
+    uploads = []
     for uploaded in uploaded_files:
         try:
-            file_bytes = uploaded.read()
+            uploads.append((uploaded.name, uploaded.read()))
         except Exception as e:
             st.error(f"Could not read {uploaded.name}: {e}")
-            continue
-
-        file_type = uploaded.name.split(".")[-1].lower()
-
-        if file_type == "txt":
-            st.write(f"Processing TXT → {uploaded.name}")
-            df = process_file_content(file_bytes)
-            if not df.empty:
-                final_df = pd.concat([final_df, df], ignore_index=True)
-
-        elif file_type == "zip":
-            st.write(f"Extracting ZIP → {uploaded.name}")
-            try:
-                with zipfile.ZipFile(io.BytesIO(file_bytes)) as z:
-                    for name in z.namelist():
-                        if name.endswith(".txt"):
-                            st.write(f"Processing inside ZIP → {name}")
-                            inner = z.read(name)
-                            df = process_file_content(inner)
-                            if not df.empty:
-                                final_df = pd.concat([final_df, df], ignore_index=True)
-            except Exception as e:
-                st.error(f"Invalid zip file {uploaded.name}: {e}")
 
+    total_files = 0
+    for name, file_bytes in uploads:
+        try:
+            total_files += len(trade_file_names(name, file_bytes))
+        except Exception:
+            total_files += 1  # reported as one failed file below
+
+    # TXT files and every TXT inside ZIP/RAR archives are parsed in parallel worker
+    # processes, files seen before come straight from the ledger, and the per-file
+    # results are concatenated once, in upload order
+    progress = st.progress(0.0, text="Parsing trade files...")
+    results = {}
+    timings = []
+    for done, (position, name, df, seconds, error, cached) in enumerate(
+            ingest_trade_files(uploads, ledger=get_ledger()), start=1):
+        if error:
+            st.error(f"Failed to parse {name}: {error}")
+        else:
+            results[position] = df
+        timings.append({"file": name, "boxes": 0 if df is None else len(df),
+                        "seconds": round(seconds, 3), "cached": cached, "error": error})
+        status = "from ledger" if cached else f"{seconds:.2f}s"
+        progress.progress(min(done / max(total_files, 1), 1.0),
+                          text=f"Parsed {done}/{total_files}: {name} ({status})")
+    progress.empty()
+    final_df = combine_results(results[position] for position in sorted(results))
+
+    if timings:
+        n_cached = sum(row["cached"] for row in timings)
+        with st.expander(f"Per-file timings ({len(timings)} files, {n_cached} from ledger)"):
+            st.dataframe(pd.DataFrame(timings), width="stretch")
 
     if final_df.empty:
         st.info("No valid data extracted.")
@@ -207,9 +84,14 @@ if not final_df.empty:
     st.subheader("📈 Cumulative PnL by Expiry")
     final_df = final_df.sort_values(["expiry", "date"])
     final_df["cumulative_pnl"] = final_df.groupby("expiry")["pnl"].cumsum()
-    fig_line = px.line(final_df, x="date", y="cumulative_pnl", color="expiry",
-                       title="Cumulative PnL Over Time for Each Expiry")
+    # Min/max decimation keeps every peak and drawdown within a fixed point budget
+    line_df = decimate(final_df, "cumulative_pnl", group="expiry")
+    fig_line = px.line(line_df, x="date", y="cumulative_pnl", color="expiry",
+                       title="Cumulative PnL Over Time for Each Expiry",
+                       render_mode="webgl" if len(line_df) > WEBGL_THRESHOLD else "auto")
     st.plotly_chart(fig_line, width="stretch")
+    if PAYLOAD_DEBUG:
+        st.caption(format_payload(fig_line))
 
     st.subheader("Total PnL for Each Stock Across Expiries")
     df_stock = final_df.groupby(['stock', 'expiry'], as_index=False)['pnl'].sum()
@@ -0,0 +1,126 @@
+"""Headless CR token generation.
+
+Runs the same ``run_analysis`` as the "Generate Token" button for every
+combination of trade date, expiry month, OI threshold and ATM range, and
+writes one token file per combination.
+
+    python token_batch.py --start 2025-07-01 --end 2025-07-31 \
+        --months JUL AUG --oi 0 500 --atm 5 8 --out tokens/
+"""
+import argparse
+import concurrent.futures
+import datetime
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+from utils.bhavcopy_cache import get_bhavcopy, get_instruments
+from utils.tokens import run_analysis
+from utils.token_store import save_token_set, previous_token_set, diff_tokens, diff_text
+from utils.trading_calendar import trading_days
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def token_file_name(date, month, oi_threshold, atm_percentage, fmt="txt", suffix=""):
+    return f"stock_crtoken_{date:%Y-%m-%d}_{month}_oi{oi_threshold}_atm{atm_percentage}{suffix}.{fmt}"
+
+
+def write_tokens(result_df, path, fmt="txt"):
+    if fmt == "csv":
+        result_df.to_csv(path, index=False)
+    else:
+        Path(path).write_text("\n".join(result_df["All Columns"].tolist()), encoding="utf-8")
+
+
+def run_date(date, combos, out_dir, fmt="txt", sort_ascending=True, diff=False):
+    """Generate every (month, oi, atm) token set for one trade date.
+
+    The Bhavcopy and its instrument index are loaded once per date and reused
+    for all combinations.  With ``diff`` a ``_diff.txt`` file with the tokens
+    added/removed since the previous trading day is written as well.
+    Returns one status row per combination.
+    """
+    rows = []
+    try:
+        data = get_bhavcopy(date)
+        instruments = get_instruments(date)
+    except Exception as e:
+        return [dict(date=date, month=m, oi_threshold=oi, atm_percentage=atm, tokens=0, file=None,
+                     error=f"Fetch failed: {e}") for m, oi, atm in combos]
+
+    for month, oi_threshold, atm_percentage in combos:
+        result_df, error = run_analysis(
+            date.strftime("%Y-%m-%d"), month, oi_threshold, atm_percentage,
+            fallback_data=data, sort_ascending=sort_ascending, instruments=instruments
+        )
+        path = None
+        if result_df is not None:
+            path = Path(out_dir) / token_file_name(date, month, oi_threshold, atm_percentage, fmt)
+            write_tokens(result_df, path, fmt)
+            save_token_set(date, month, oi_threshold, atm_percentage, result_df["All Columns"].tolist())
+            if diff:
+                _, prev_tokens = previous_token_set(date, month, oi_threshold, atm_percentage)
+                if prev_tokens is not None:
+                    diff_df = diff_tokens(result_df["All Columns"], prev_tokens, sort_ascending)
+                    diff_path = Path(out_dir) / token_file_name(date, month, oi_threshold, atm_percentage, "txt", "_diff")
+                    diff_path.write_text(diff_text(diff_df), encoding="utf-8")
+        rows.append(dict(date=date, month=month, oi_threshold=oi_threshold, atm_percentage=atm_percentage,
+                         tokens=0 if result_df is None else len(result_df),
+                         file=None if path is None else str(path), error=error))
+    return rows
+
+
+def run_batch(dates, months, oi_thresholds, atm_percentages, out_dir, fmt="txt",
+              sort_ascending=True, workers=None, diff=False):
+    """Fan the token generation out over a process pool, yielding status rows as dates finish."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    combos = list(itertools.product(months, oi_thresholds, atm_percentages))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_date, d, combos, out_dir, fmt, sort_ascending, diff) for d in dates]
+        for future in concurrent.futures.as_completed(futures):
+            yield from future.result()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate stock CR tokens for many dates and months.")
+    parser.add_argument("--start", required=True, type=datetime.date.fromisoformat, help="First trade date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="Last trade date, defaults to --start")
+    parser.add_argument("--months", nargs="+", type=str.upper, choices=MONTHS, required=True, help="Expiry months")
+    parser.add_argument("--oi", nargs="+", type=int, default=[0], help="OI thresholds")
+    parser.add_argument("--atm", nargs="+", type=int, default=[8], help="ATM range percentages")
+    parser.add_argument("--out", default="tokens", help="Output directory")
+    parser.add_argument("--format", choices=["txt", "csv"], default="txt")
+    parser.add_argument("--descending", action="store_true", help="Sort tokens descending")
+    parser.add_argument("--diff", action="store_true", help="Also write tokens added/removed since the previous trading day")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process pool size")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dates = [d.date() for d in trading_days(args.start, args.end or args.start)]
+    if not dates:
+        print("No trading days in the selected range.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    done = failed = 0
+    for row in run_batch(dates, args.months, args.oi, args.atm, args.out, args.format,
+                         sort_ascending=not args.descending, workers=args.workers, diff=args.diff):
+        label = f"{row['date']} {row['month']} oi={row['oi_threshold']} atm={row['atm_percentage']}%"
+        if row["file"]:
+            done += 1
+            print(f"OK   {label}: {row['tokens']} tokens -> {row['file']}", flush=True)
+        else:
+            failed += 1
+            print(f"FAIL {label}: {row['error']}", flush=True)
+
+    print(f"{done} token files written, {failed} failed in {time.perf_counter() - started:.1f}s")
+    return 0 if done else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import pandas as pd
+
+
+CUBE_KEYS = ["TckrSymb", "XpryDt", "StrkPric", "OptnTp"]
+
+# Dashboard metric name -> cube column
+METRICS = {
+    "Volume": "volume_value",
+    "Open Interest": "oi_value",
+    "Change in OI": "chg_oi_value",
+}
+
+
+# -------------------------
+# Helper: traded-value aggregate cube
+# -------------------------
+def build_cube(df):
+    """Total traded value per symbol x expiry x strike x option type for all three metrics.
+
+    Computed once per Bhavcopy so switching metric, stock or expiry in the
+    dashboard is a slice of this small frame instead of a pass over raw rows.
+    """
+    df = df.dropna(subset=["StrkPric", "OptnTp"])
+    values = pd.DataFrame({
+        "TckrSymb": df["TckrSymb"].astype(str),
+        "XpryDt": df["XpryDt"].astype(str),
+        "StrkPric": df["StrkPric"],
+        "OptnTp": df["OptnTp"].astype(str),
+        "volume_value": df["TtlTradgVol"] * df["NewBrdLotQty"] * df["SttlmPric"],
+        "oi_value": df["OpnIntrst"] * df["SttlmPric"],
+        "chg_oi_value": df["ChngInOpnIntrst"] * df["SttlmPric"],
+    })
+    cube = values.groupby(CUBE_KEYS, sort=True).sum().reset_index()
+    for col in ["TckrSymb", "XpryDt", "OptnTp"]:
+        cube[col] = cube[col].astype("category")
+    return cube
+
+
+def _slice(cube, expiry=None, symbol=None):
+    mask = pd.Series(True, index=cube.index)
+    if expiry is not None:
+        mask &= cube["XpryDt"] == expiry
+    if symbol is not None:
+        mask &= cube["TckrSymb"] == symbol
+    return cube[mask]
+
+
+def symbol_totals(cube, metric, expiry=None, symbols=None):
+    """Traded value per symbol as ``TckrSymb`` / ``total_traded_value`` rows."""
+    part = _slice(cube, expiry)
+    if symbols is not None:
+        part = part[part["TckrSymb"].isin(symbols)]
+    totals = part.groupby("TckrSymb", observed=True)[METRICS[metric]].sum()
+    return totals.rename("total_traded_value").reset_index()
+
+
+def strike_values(cube, metric, symbol, expiry=None):
+    """Traded value per strike and option type for one symbol."""
+    part = _slice(cube, expiry, symbol)
+    return part[["StrkPric", "OptnTp", METRICS[metric]]].rename(
+        columns={METRICS[metric]: "total_traded_value"}
+    ).reset_index(drop=True)
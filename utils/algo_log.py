@@ -0,0 +1,129 @@
+import csv
+import io
+import re
+
+import pandas as pd
+
+
+_BOX = (
+    r"BOX{ws}(\w+\d*)-(\d+)-(\d+)(CE|PE){ws}Strategy{ws}Trade{ws}Confirmed{ws}Qty{ws}([-+]?\d+){ws}@{ws}"
+    r"([-+]?\d*\.\d+|\d+){ws}\[Parity{ws}Was{ws}([-+]?\d*\.\d+|\d+)"
+)
+# Box confirmation inside one message field
+BOX_PATTERN = re.compile(_BOX.format(ws=r"\s+"))
+# A whole unquoted "date,status,ALGOTRADE,message" line holding a box confirmation;
+# field patterns stop at commas, so a match is exactly one well-formed four-field line
+BOX_LINE_PATTERN = re.compile(
+    r'([^,"]*),([^,"]*),(ALGOTRADE),([^,"]*?' + _BOX.format(ws=r"\s+") + r'[^,"]*)'
+)
+
+LOG_COLUMNS = ['date', 'status', 'type', 'message']
+BOX_COLUMNS = ['expiry', 'itm_stk', 'counter', 'option_type', 'open_cls', 'traded_parity', 'asked_parity']
+NUMERIC_COLUMNS = ['itm_stk', 'counter', 'open_cls', 'traded_parity', 'asked_parity']
+MAX_ASKED_PARITY = 5000
+
+
+# -------------------------
+# Helper: streaming algo log parser
+# -------------------------
+def box_trade_fields(line):
+    """Field tuple (``LOG_COLUMNS + BOX_COLUMNS``) of one log line, or ``None`` if it isn't a box confirmation."""
+    if "ALGOTRADE" not in line:
+        return None
+    line = line.rstrip("\r\n")
+    if '"' not in line:
+        match = BOX_LINE_PATTERN.fullmatch(line)
+        return match.groups() if match is not None else None
+    # Quoted fields: split the line like the CSV reader would
+    fields = next(csv.reader([line]), [])
+    if len(fields) != len(LOG_COLUMNS) or fields[2] != "ALGOTRADE":
+        return None
+    match = BOX_PATTERN.search(fields[3])
+    return tuple(fields) + match.groups() if match is not None else None
+
+
+def iter_box_trades(lines):
+    """Yield the field tuples of the box confirmations among ``lines``.
+
+    Lines without ``ALGOTRADE`` are skipped before any regex runs, so the
+    bulk of a log (heartbeats, order updates) costs one substring check.
+    """
+    for line in lines:
+        fields = box_trade_fields(line)
+        if fields is not None:
+            yield fields
+
+
+def box_trades_frame(trades):
+    """Typed frame from box confirmation field tuples, without implausible parities."""
+    df = pd.DataFrame(list(trades), columns=LOG_COLUMNS + BOX_COLUMNS, dtype=object)
+    df = df.astype(dict.fromkeys(NUMERIC_COLUMNS, float))
+    return df[df['asked_parity'] < MAX_ASKED_PARITY].reset_index(drop=True)
+
+
+def parse_algo_log(content, header=True):
+    """ALGOTRADE box confirmations of an algo log (``bytes``), typed and in file order.
+
+    The log is decoded and parsed a line at a time; only the box rows are
+    kept.  With ``header`` the first non-blank line is the CSV header and
+    skipped.
+    """
+    lines = io.TextIOWrapper(io.BytesIO(content), encoding="utf-8")
+    if header:
+        for line in lines:
+            if line.strip():
+                break
+    return box_trades_frame(iter_box_trades(lines))
+
+
+# -------------------------
+# Helper: per-trade metrics and box-size summary
+# -------------------------
+LOT_SIZES = {
+    'NIFTY': 75,
+    'BANKNIFTY': 30,
+    'MIDCPNIFTY': 120,
+    'FINNIFTY': 65,
+}
+SUMMARY_KEYS = ['instrument', 'expiry', 'box_size']
+SUMMARY_COLUMNS = SUMMARY_KEYS + [
+    'total_trades', 'correct_trades', 'wrong_trades',
+    'positive_alpha', 'negative_alpha', 'net_alpha', 'gross_flow',
+]
+
+
+def add_box_metrics(df, lot_sizes=LOT_SIZES):
+    """Add instrument, per-row lot size, box size, alpha (``pnl``) and gross flow columns.
+
+    The instrument is the leading capitals of the expiry (``BANKNIFTY25MAR``
+    -> ``BANKNIFTY``); rows of an unknown instrument get a NaN lot size.
+    """
+    df = df.copy()
+    df['instrument'] = df['expiry'].str.extract(r'([A-Z]+)', expand=False)
+    df['lot_size'] = df['instrument'].map(lot_sizes)
+    df['box_size'] = (df['itm_stk'] - df['counter']).abs()
+    df['parity_diff'] = (df['traded_parity'] - df['asked_parity']) * df['open_cls'].abs()
+    df['pnl'] = df['parity_diff'] * df['lot_size']
+    df['wrong_right'] = (df['traded_parity'] > df['asked_parity']).map({True: 'right', False: 'wrong'})
+    df['gross_flow'] = df['traded_parity'] * df['open_cls'].abs() * df['lot_size']
+    return df
+
+
+def box_summary(df):
+    """Traded quantity, alpha and gross flow per (instrument, expiry, box size) in one groupby."""
+    qty = df['open_cls'].abs()
+    right = df['wrong_right'] == 'right'
+    parts = pd.DataFrame({
+        'instrument': df['instrument'],
+        'expiry': df['expiry'],
+        'box_size': df['box_size'],
+        'total_trades': qty,
+        'correct_trades': qty.where(right, 0),
+        'wrong_trades': qty.where(~right, 0),
+        'positive_alpha': df['pnl'].where(right, 0),
+        'negative_alpha': df['pnl'].where(~right, 0),
+        'gross_flow': df['gross_flow'],
+    })
+    summary = parts.groupby(SUMMARY_KEYS, sort=True).sum().reset_index()
+    summary['net_alpha'] = summary['positive_alpha'] + summary['negative_alpha']
+    return summary[SUMMARY_COLUMNS]
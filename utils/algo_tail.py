@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.algo_log import parse_algo_log, add_box_metrics, box_summary, SUMMARY_KEYS, SUMMARY_COLUMNS
+from utils.atomic_write import write_text_atomic
+
+
+DEFAULT_STATE_DIR = Path(os.environ.get(
+    "ALGO_TAIL_STATE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "algo_tail"
+))
+# Directory the live tail may read logs from; the tail is disabled when unset
+DEFAULT_LOG_DIR = os.environ.get("ALGO_LOG_DIR") or None
+MAX_READ_BYTES = 64 * 1024 * 1024  # per poll, so a huge backlog is caught up in steps
+
+
+def _empty_summary():
+    return pd.DataFrame(columns=SUMMARY_COLUMNS).astype({col: float for col in SUMMARY_COLUMNS[2:]})
+
+
+def merge_summaries(summary, update):
+    """Add the totals of ``update`` to ``summary`` (both ``box_summary`` frames)."""
+    if summary.empty:
+        return update.reset_index(drop=True)
+    combined = pd.concat([summary, update], ignore_index=True)
+    merged = combined.groupby(SUMMARY_KEYS, sort=True)[SUMMARY_COLUMNS[3:]].sum().reset_index()
+    merged['net_alpha'] = merged['positive_alpha'] + merged['negative_alpha']
+    return merged[SUMMARY_COLUMNS]
+
+
+# -------------------------
+# Helper: logs the live tail may follow
+# -------------------------
+def _inside(path, root):
+    return path == root or root in path.parents
+
+
+def list_logs(log_dir=DEFAULT_LOG_DIR):
+    """Names of the files in ``log_dir`` (symlinks leading outside it excluded)."""
+    if not log_dir:
+        return []
+    root = Path(log_dir).resolve()
+    try:
+        entries = sorted(root.iterdir())
+    except OSError:
+        return []
+    return [p.name for p in entries if p.is_file() and _inside(p.resolve(), root)]
+
+
+def resolve_log_path(name, log_dir=DEFAULT_LOG_DIR):
+    """Resolved path of the log file ``name`` in ``log_dir``.
+
+    Raises ``ValueError`` (without saying whether the path exists) for
+    anything that isn't a file inside ``log_dir``: absolute paths, ``..``,
+    symlinks out of it, or no configured directory at all.
+    """
+    if not log_dir:
+        raise ValueError("No algo log directory configured (set ALGO_LOG_DIR)")
+    root = Path(log_dir).resolve()
+    path = (root / name).resolve()
+    if not _inside(path, root) or path == root or not path.is_file():
+        raise ValueError(f"Not a log file in the algo log directory: {name}")
+    return path
+
+
+# -------------------------
+# Helper: live tail of a growing algo log
+# -------------------------
+class AlgoLogTail:
+    """Box summary of an algo log that is still being written, updated from appended bytes only.
+
+    Each ``poll`` reads the complete lines added since the saved byte offset,
+    parses their box confirmations and adds their per-box-size totals to the
+    running summary.  The offset and summary are saved next to each other so
+    a restarted dashboard resumes where it left off.  If the file shrinks or
+    is replaced (log rotation) the tail starts over from the beginning.  A
+    line longer than ``max_read_bytes`` can't be a box confirmation and is
+    skipped.
+    """
+
+    def __init__(self, path, state_dir=DEFAULT_STATE_DIR, max_read_bytes=MAX_READ_BYTES):
+        self.path = Path(path)
+        self.max_read_bytes = max_read_bytes
+        key = hashlib.sha1(str(self.path.resolve()).encode("utf-8")).hexdigest()[:16]
+        self.state_path = Path(state_dir) / f"{key}.json"
+        self.reset()
+        self._load_state()
+
+    def reset(self):
+        self.inode = None
+        self.offset = 0
+        self.header_seen = False
+        self.skipping = False  # inside an over-long line, dropping bytes up to its newline
+        self.trades = 0
+        self.unknown = set()
+        self.summary = _empty_summary()
+
+    def _load_state(self):
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.inode = state["inode"]
+        self.offset = state["offset"]
+        self.header_seen = state["header_seen"]
+        self.skipping = state.get("skipping", False)
+        self.trades = state["trades"]
+        self.unknown = set(state["unknown"])
+        self.summary = pd.DataFrame(state["summary"], columns=SUMMARY_COLUMNS)
+
+    def _save_state(self):
+        state = {
+            "path": str(self.path),
+            "inode": self.inode,
+            "offset": self.offset,
+            "header_seen": self.header_seen,
+            "skipping": self.skipping,
+            "trades": self.trades,
+            "unknown": sorted(self.unknown),
+            "summary": self.summary.to_dict(orient="records"),
+        }
+        write_text_atomic(self.state_path, json.dumps(state))
+
+    def poll(self):
+        """Fold newly appended box trades into the summary and return them (with metrics)."""
+        stat = self.path.stat()
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.reset()
+            self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return add_box_metrics(parse_algo_log(b""))
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(min(stat.st_size - self.offset, self.max_read_bytes))
+
+        if self.skipping:
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                self.offset += len(chunk)
+                self._save_state()
+                return add_box_metrics(parse_algo_log(b""))
+            self.skipping = False
+            self.offset += newline + 1
+            chunk = chunk[newline + 1:]
+
+        # Only complete lines; a line still being written is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        if not end and len(chunk) == self.max_read_bytes:
+            # A whole read window without a newline: drop this line
+            self.skipping = True
+            self.offset += len(chunk)
+            self._save_state()
+            return add_box_metrics(parse_algo_log(b""))
+        chunk = chunk[:end]
+        if not chunk:
+            self._save_state()
+            return add_box_metrics(parse_algo_log(b""))
+
+        new = add_box_metrics(parse_algo_log(chunk, header=not self.header_seen))
+        self.header_seen = self.header_seen or bool(chunk.strip())
+        self.offset += end
+
+        self.unknown.update(new.loc[new['lot_size'].isna(), 'expiry'])
+        new = new[new['lot_size'].notna()]
+        if not new.empty:
+            self.trades += len(new)
+            self.summary = merge_summaries(self.summary, box_summary(new))
+        self._save_state()
+        return new
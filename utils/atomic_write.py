@@ -0,0 +1,35 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# -------------------------
+# Helper: crash-safe file writes
+# -------------------------
+@contextmanager
+def atomic_write(path, prefix=None, suffix=".tmp"):
+    """Temporary path to write in place of ``path``, moved over it on success.
+
+    The temporary file sits in ``path``'s directory (created if needed), so
+    the final ``os.replace`` is atomic and readers never see a partial file.
+    If the write raises, the temporary file is removed and ``path`` is left
+    untouched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=prefix, suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def write_text_atomic(path, text):
+    """Write ``text`` (UTF-8) to ``path`` through ``atomic_write``."""
+    with atomic_write(path) as tmp:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.atomic_write import atomic_write
+from utils.bhavcopy_loader import BHAVCOPY_SCHEMA
+
+
+DEFAULT_STORE_DIR = Path(os.environ.get(
+    "BHAV_STORE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "bhavstore"
+))
+
+# Small row groups so a symbol/expiry filter touches only a few of them per day
+ROW_GROUP_SIZE = 4096
+
+_ARROW_TYPES = {"float64": pa.float64()}
+SCHEMA = pa.schema([(col, _ARROW_TYPES.get(dtype, pa.string())) for col, dtype in BHAVCOPY_SCHEMA.items()])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def _day(date):
+    return f"{pd.Timestamp(date):%Y-%m-%d}"
+
+
+# -------------------------
+# Helper: date-partitioned Bhavcopy store
+# -------------------------
+class BhavStore:
+    """Multi-day Bhavcopy store laid out as ``date=YYYY-MM-DD/part-0.parquet``.
+
+    Rows inside each day are sorted by ``TckrSymb`` and ``XpryDt`` and split
+    into small row groups, so the min/max statistics let a
+    symbol/expiry/date-range query skip every other partition and row group.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    def partition(self, date):
+        return self.root / f"date={_day(date)}"
+
+    def __contains__(self, date):
+        return (self.partition(date) / "part-0.parquet").exists()
+
+    def missing(self, dates):
+        return [d for d in dates if d not in self]
+
+    def ingest(self, date, df):
+        """Write one day's Bhavcopy, replacing any existing partition atomically."""
+        cols = [c for c in SCHEMA.names if c in df.columns]
+        df = df[cols].sort_values(["TckrSymb", "XpryDt"], kind="stable").reset_index(drop=True)
+        for col in cols:
+            if SCHEMA.field(col).type == pa.string():
+                df[col] = df[col].astype("string")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.cast(pa.schema([SCHEMA.field(c) for c in cols]))
+        for field in SCHEMA:
+            if field.name not in table.column_names:
+                table = table.append_column(field, pa.nulls(len(table), field.type))
+        table = table.select(SCHEMA.names)
+
+        part = self.partition(date)
+        # Dot-prefixed, so dataset discovery skips it (pyarrow ignores "."/"_" files)
+        with atomic_write(part / "part-0.parquet", prefix=".part-") as tmp:
+            pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE, compression="zstd")
+
+    def query(self, symbol=None, expiry=None, start=None, end=None, columns=None):
+        """Rows matching the symbol/expiry between ``start`` and ``end`` (inclusive).
+
+        The result carries the partition key as a ``date`` column (``YYYY-MM-DD``).
+        """
+        if not self.root.exists():
+            return pd.DataFrame(columns=(columns or SCHEMA.names) + ["date"])
+        expr = ds.scalar(True)
+        if symbol is not None:
+            expr &= ds.field("TckrSymb") == symbol
+        if expiry is not None:
+            expr &= ds.field("XpryDt") == expiry
+        if start is not None:
+            expr &= ds.field("date") >= _day(start)
+        if end is not None:
+            expr &= ds.field("date") <= _day(end)
+        dataset = ds.dataset(self.root, format="parquet", partitioning=PARTITIONING)
+        columns = None if columns is None else list(dict.fromkeys(list(columns) + ["date"]))
+        return dataset.to_table(filter=expr, columns=columns).to_pandas()
+
+
+_default_store = None
+
+
+def get_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = BhavStore()
+    return _default_store
@@ -0,0 +1,164 @@
+import datetime
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from utils.atomic_write import atomic_write
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "BHAVCOPY_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "bhavcopy"
+))
+DEFAULT_MAX_BYTES = int(os.environ.get("BHAVCOPY_CACHE_MAX_MB", 512)) * 1024 * 1024
+
+
+def _to_date(date):
+    # Accepts dates, timestamps and the "dd-mm-YYYY" strings nselib uses
+    if isinstance(date, str):
+        try:
+            return datetime.datetime.strptime(date, "%d-%m-%Y").date()
+        except ValueError:
+            pass
+    return pd.Timestamp(date).date()
+
+
+def nse_fetcher(date):
+    # Imported lazily so the cache can be used (and tested) without nselib installed
+    from nselib import derivatives
+    return derivatives.fno_bhav_copy(date.strftime("%d-%m-%Y"))
+
+
+# -------------------------
+# Helper: on-disk Bhavcopy cache
+# -------------------------
+class BhavcopyCache:
+    """Date-keyed Parquet cache for daily F&O Bhavcopies.
+
+    Past trading days never change, so once a day is on disk it is never
+    fetched again.  Today's file is still being published by the exchange and
+    is only kept in memory for the lifetime of the process.  Files are written
+    atomically and the least recently used days are evicted once the
+    directory grows past ``max_bytes``.
+
+    Frames derived from a day (the parsed instrument index, the traded-value
+    cube) are stored next to its Bhavcopy as ``<date>.<name>.parquet``.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, fetcher=nse_fetcher, today=None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher
+        self._today = today or datetime.date.today
+        self._lock = threading.Lock()
+        self._live = {}
+
+    def path_for(self, date):
+        return self.root / f"{_to_date(date):%Y-%m-%d}.parquet"
+
+    def __contains__(self, date):
+        return self.path_for(date).exists()
+
+    def _read(self, path):
+        if not path.exists():
+            return None
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # mark as recently used
+            return df
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write(self, path, df):
+        with atomic_write(path) as tmp:
+            df.to_parquet(tmp, index=False, compression="zstd")
+        self.evict()
+        return path
+
+    def get(self, date):
+        date = _to_date(date)
+        df = self._read(self.path_for(date))
+        if df is not None:
+            return df
+
+        if date >= self._today():
+            if date not in self._live:
+                self._live[date] = self.fetcher(date).reset_index(drop=True)
+            return self._live[date].copy()
+
+        df = self.fetcher(date).reset_index(drop=True)
+        self.put(date, df)
+        return df
+
+    def put(self, date, df):
+        return self._write(self.path_for(date), df.reset_index(drop=True))
+
+    def derived_path_for(self, date, name):
+        return self.root / f"{_to_date(date):%Y-%m-%d}.{name}.parquet"
+
+    def get_derived(self, date, name, build):
+        """Frame computed from the Bhavcopy of ``date`` by ``build``, cached as ``<date>.<name>.parquet``."""
+        date = _to_date(date)
+        path = self.derived_path_for(date, name)
+        df = self._read(path)
+        if df is not None:
+            return df
+
+        key = (name, date)
+        if key in self._live:
+            return self._live[key]
+        df = build(self.get(date)).reset_index(drop=True)
+        if date >= self._today():
+            self._live[key] = df
+        else:
+            self._write(path, df)
+        return df
+
+    def get_instruments(self, date):
+        """Parsed ``FinInstrmNm`` index for ``date``, row-aligned with :meth:`get`."""
+        from utils.instruments import build_instrument_index
+        return self.get_derived(date, "instruments", build_instrument_index)
+
+    def get_cube(self, date):
+        """Traded-value aggregate cube for ``date`` (see :func:`utils.aggregates.build_cube`)."""
+        from utils.aggregates import build_cube
+        return self.get_derived(date, "cube", build_cube)
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.root.glob("*.parquet"))
+
+    def evict(self):
+        with self._lock:
+            files = sorted(self.root.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+            total = sum(p.stat().st_size for p in files)
+            while files and total > self.max_bytes:
+                oldest = files.pop(0)
+                total -= oldest.stat().st_size
+                oldest.unlink(missing_ok=True)
+
+
+_default_cache = None
+
+
+def get_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BhavcopyCache()
+    return _default_cache
+
+
+def get_bhavcopy(date):
+    """Return the F&O Bhavcopy for ``date`` through the shared process-wide cache."""
+    return get_cache().get(date)
+
+
+def get_instruments(date):
+    """Return the instrument index for ``date`` through the shared process-wide cache."""
+    return get_cache().get_instruments(date)
+
+
+def get_cube(date):
+    """Return the traded-value cube for ``date`` through the shared process-wide cache."""
+    return get_cache().get_cube(date)
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+
+import pandas as pd
+
+
+# Columns of the NSE F&O (UDiFF) Bhavcopy used by the token pipeline and the
+# dashboards, with the dtype each one is parsed into.
+BHAVCOPY_SCHEMA = {
+    "TradDt": "category",
+    "TckrSymb": "category",
+    "XpryDt": "category",
+    "FinInstrmNm": "string",
+    "OptnTp": "category",
+    "StrkPric": "float64",
+    "UndrlygPric": "float64",
+    "ClsPric": "float64",
+    "SttlmPric": "float64",
+    "OpnIntrst": "float64",
+    "ChngInOpnIntrst": "float64",
+    "TtlTradgVol": "float64",
+    "NewBrdLotQty": "float64",
+}
+
+# Without these run_analysis cannot produce tokens
+REQUIRED_COLUMNS = ["FinInstrmNm", "OptnTp", "StrkPric", "UndrlygPric", "OpnIntrst", "NewBrdLotQty"]
+
+
+def _engine():
+    try:
+        import pyarrow  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+
+def resident_bytes():
+    """Resident memory of this process in bytes (peak RSS where the current one can't be read).
+
+    ``None`` where neither is available (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# -------------------------
+# Helper: typed Bhavcopy CSV loader
+# -------------------------
+def load_bhavcopy_csv(file, schema=BHAVCOPY_SCHEMA):
+    """Read a Bhavcopy CSV keeping only ``schema`` columns with their final dtypes.
+
+    Uses the multithreaded Arrow parser when pyarrow is installed.  Category
+    columns are read as text first: Arrow would otherwise infer dates in
+    ``TradDt``/``XpryDt`` and build categories of ``datetime.date``, unlike
+    the strings every other Bhavcopy source gives.  Returns ``(df, stats)``
+    where ``stats`` has the parse time in seconds, the row count, the
+    frame's own size (``frame_bytes``) and the process's resident memory
+    after loading (``rss_bytes``).
+    """
+    started = time.perf_counter()
+    header = pd.read_csv(file, nrows=0).columns
+    file.seek(0)
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Not a F&O Bhavcopy, missing columns: {', '.join(missing)}")
+
+    usecols = [c for c in header if c in schema]
+    df = pd.read_csv(
+        file,
+        usecols=usecols,
+        dtype={c: "string" if schema[c] == "category" else schema[c] for c in usecols},
+        engine=_engine(),
+    )
+    for c in usecols:
+        if schema[c] == "category":
+            df[c] = pd.Categorical(df[c].to_numpy(dtype=object, na_value=None))
+    stats = {
+        "seconds": time.perf_counter() - started,
+        "rows": len(df),
+        "frame_bytes": int(df.memory_usage(deep=True).sum()),
+        "rss_bytes": resident_bytes(),
+    }
+    return df, stats
@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Point budgets per figure; beyond these the browser payload and render time
+# grow much faster than what a reader can actually see on screen.
+LINE_POINT_BUDGET = 2000
+ANIMATION_FRAME_BUDGET = 60
+HEATMAP_COLUMN_BUDGET = 120
+WEBGL_THRESHOLD = 1000
+
+
+# -------------------------
+# Helper: payload reduction for Plotly figures
+# -------------------------
+def decimate(df, y, max_points=LINE_POINT_BUDGET, group=None):
+    """Min/max bucket decimation of line data to about ``max_points`` rows.
+
+    Rows are split into equal buckets per series (``group``) and only each
+    bucket's first, last, minimum and maximum rows are kept, so peaks and
+    drawdowns survive.  Row order is preserved.
+    """
+    if len(df) <= max_points:
+        return df
+    keys = df[group] if group is not None else pd.Series(0, index=df.index)
+    n_series = max(keys.nunique(dropna=False), 1)
+    buckets_per_series = max(max_points // (4 * n_series), 1)
+
+    # dropna=False throughout: rows whose series key is missing (e.g. a NaT expiry) are a series too
+    by_key = keys.groupby(keys, sort=False, dropna=False)
+    pos = by_key.cumcount().to_numpy()
+    size = by_key.transform("size").to_numpy()
+    bucket = pos * buckets_per_series // size
+
+    values = pd.DataFrame({"key": keys.to_numpy(), "bucket": bucket, "y": df[y].to_numpy()})
+    grouped = values.groupby(["key", "bucket"], sort=False, dropna=False)
+    # Min/max only over the points that have a value; an all-NaN bucket keeps its first and last rows
+    present = values.dropna(subset=["y"]).groupby(["key", "bucket"], sort=False, dropna=False)["y"]
+    keep = np.unique(np.concatenate([
+        grouped.head(1).index.to_numpy(),
+        grouped.tail(1).index.to_numpy(),
+        present.idxmin().to_numpy(dtype=int),
+        present.idxmax().to_numpy(dtype=int),
+    ]))
+    return df.iloc[keep]
+
+
+def drop_empty_strikes(df, value, strike="StrkPric", pad=1):
+    """Trim far-OTM strikes where ``value`` is zero/NaN on every row.
+
+    Keeps the band between the lowest and highest strike with any value,
+    plus ``pad`` strikes on each side.
+    """
+    active = df.loc[df[value].fillna(0) != 0, strike]
+    if active.empty:
+        return df
+    strikes = np.sort(df[strike].dropna().unique())
+    lo = max(np.searchsorted(strikes, active.min()) - pad, 0)
+    hi = min(np.searchsorted(strikes, active.max()) + pad, len(strikes) - 1)
+    return df[df[strike].between(strikes[lo], strikes[hi])]
+
+
+def limit_frames(df, frame, max_frames=ANIMATION_FRAME_BUDGET):
+    """Keep at most ``max_frames`` evenly spaced animation frames (always including the last)."""
+    frames = pd.Index(pd.unique(df[frame]))
+    if len(frames) <= max_frames:
+        return df
+    picks = np.unique(np.linspace(0, len(frames) - 1, max_frames).round().astype(int))
+    return df[df[frame].isin(frames[picks])]
+
+
+def bin_heatmap(values, pct, max_columns=HEATMAP_COLUMN_BUDGET, base=None):
+    """% change heatmap with at most ``max_columns`` date columns and no empty rows.
+
+    ``pct`` is the day-on-day % change of the ``values`` matrix (same shape)
+    and is returned as is when it fits.  Otherwise adjacent dates are binned:
+    % changes don't combine by averaging, so each bin shows the % change of
+    its last value against the previous bin's last value (``base``, the
+    values of the day before the first column, for the first bin).  Each
+    binned column is labelled with the last date it covers.
+    """
+    n = values.shape[1]
+    if n <= max_columns:
+        return pct.dropna(how="all")
+    bins = np.arange(n) * max_columns // n
+    last = values.T.groupby(bins).last().T
+    previous = last.shift(1, axis=1)
+    if base is not None:
+        previous.iloc[:, 0] = base.reindex(last.index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        binned = ((last / previous - 1) * 100).round(2)
+    binned.columns = [values.columns[np.flatnonzero(bins == b)[-1]] for b in last.columns]
+    return binned.dropna(how="all")
+
+
+# Chart payload sizes serialize the whole figure a second time, so they are
+# only measured when debugging a page (CHART_PAYLOAD_DEBUG=1)
+PAYLOAD_DEBUG = os.environ.get("CHART_PAYLOAD_DEBUG", "") not in ("", "0")
+
+
+def payload_size(fig):
+    """Size in bytes of the JSON that is shipped to the browser for ``fig``."""
+    return len(fig.to_json().encode("utf-8"))
+
+
+def format_payload(fig):
+    size = payload_size(fig)
+    return f"Chart payload: {size / 1024:.0f} KB" if size < 1024 * 1024 else f"Chart payload: {size / 1024 / 1024:.1f} MB"
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+# SBIN25JAN800CE, BANKNIFTY25JAN48000.5PE, 360ONE25JANFUT ...
+_PATTERN = (
+    r"^(?P<underlying>.+?)(?P<year>\d{2})(?P<month>[A-Z]{3})"
+    r"(?:(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)|(?P<option_type_fut>FUT))$"
+)
+
+
+# -------------------------
+# Helper: structured instrument index
+# -------------------------
+def parse_instruments(names):
+    """Split ``FinInstrmNm`` values into typed columns.
+
+    The regex runs once per distinct name.  Names that do not follow the
+    exchange format keep the whole name as ``underlying`` so substring checks
+    on that column behave exactly like checks on the raw name.
+    """
+    names = pd.Series(names).astype("category")
+    categories = names.cat.categories.astype(str)
+    parsed = pd.Series(categories).str.extract(_PATTERN)
+    parsed["option_type"] = parsed["option_type"].fillna(parsed.pop("option_type_fut"))
+    parsed["underlying"] = parsed["underlying"].fillna(pd.Series(categories))
+    parsed["fractional_strike"] = parsed["strike"].str.contains(".", regex=False, na=False)
+
+    # Broadcast the per-name results back to rows through the category codes
+    # (missing names have code -1 and come back as all-NaN rows)
+    parsed = parsed.reindex(names.cat.codes.to_numpy())
+    parsed.index = names.index
+
+    return pd.DataFrame({
+        "underlying": parsed["underlying"].astype("category"),
+        "year": pd.to_numeric(parsed["year"], errors="coerce").astype("Int16"),
+        "month": pd.Categorical(parsed["month"], categories=MONTHS),
+        "strike": pd.to_numeric(parsed["strike"], errors="coerce"),
+        "option_type": pd.Categorical(parsed["option_type"], categories=["CE", "PE", "FUT"]),
+        "fractional_strike": parsed["fractional_strike"].eq(True).to_numpy(),
+    }, index=names.index)
+
+
+def build_instrument_index(data):
+    """Instrument index for a Bhavcopy frame, including the parsed expiry date."""
+    index = parse_instruments(data["FinInstrmNm"])
+    if "XpryDt" in data.columns:
+        index.insert(1, "expiry", pd.to_datetime(data["XpryDt"], errors="coerce"))
+    return index
+
+
+def contains(column, text):
+    """Substring test on a categorical column, evaluated once per category."""
+    hits = np.append(column.cat.categories.astype(str).str.contains(text, regex=False), False)
+    return hits[column.cat.codes.to_numpy()]
@@ -0,0 +1,183 @@
+import concurrent.futures
+import time
+
+import pandas as pd
+
+
+# -------------------------
+# Helper: quote / option-chain sources
+# -------------------------
+def yf_ltp(stock):
+    import yfinance as yf
+    data = yf.Ticker(stock.upper() + ".NS").get_info()
+    return data.get("currentPrice") or data.get("regularMarketPrice")
+
+
+def nse_option_chain(stock):
+    from nselib import derivatives
+    return derivatives.nse_live_option_chain(stock)
+
+
+class HttpChainSource:
+    """Quote and option-chain source over one pooled ``requests`` session.
+
+    Expects ``GET {base_url}/quote/<symbol>`` returning ``{"price": ...}`` and
+    ``GET {base_url}/option-chain/<symbol>`` returning the option-chain rows
+    (same columns as ``nse_live_option_chain``) as a JSON list.  Used to load
+    test the scanner against a local fake server.
+    """
+
+    def __init__(self, base_url, pool_size=32, timeout=10):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def ltp(self, stock):
+        resp = self.session.get(f"{self.base_url}/quote/{stock}", timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json().get("price")
+
+    def option_chain(self, stock):
+        resp = self.session.get(f"{self.base_url}/option-chain/{stock}", timeout=self.timeout)
+        resp.raise_for_status()
+        return pd.DataFrame(resp.json())
+
+
+# -------------------------
+# Helper: per-symbol traded value
+# -------------------------
+def symbol_trade_values(data, ltp):
+    """CALL (strike <= LTP) and PUT (strike >= LTP) traded value per ``Symbol`` of one option chain."""
+    lot_size = data[data["CALLS_Ask_Qty"] != 0]["CALLS_Ask_Qty"].min()
+    lot_size = 1 if pd.isna(lot_size) or lot_size == 0 else lot_size
+    calls = data[data["Strike_Price"] <= ltp]
+    puts = data[data["Strike_Price"] >= ltp]
+    call_value = (calls["CALLS_Volume"] * calls["CALLS_LTP"] * lot_size).groupby(calls["Symbol"]).sum()
+    put_value = (puts["PUTS_Volume"] * puts["PUTS_LTP"] * lot_size).groupby(puts["Symbol"]).sum()
+    return call_value.to_dict(), put_value.to_dict()
+
+
+class Rankings:
+    """Running CALL/PUT traded-value totals per symbol, updated as symbols complete."""
+
+    def __init__(self):
+        self.calls = {}
+        self.puts = {}
+
+    def add(self, call_values, put_values):
+        for symbol, value in call_values.items():
+            self.calls[symbol] = self.calls.get(symbol, 0) + value
+        for symbol, value in put_values.items():
+            self.puts[symbol] = self.puts.get(symbol, 0) + value
+
+    @staticmethod
+    def _top(totals, column, n):
+        top = pd.Series(totals, dtype=float).sort_values(ascending=False).head(n)
+        return top.rename_axis("Symbol").rename(column).reset_index()
+
+    def top_calls(self, n=10):
+        return self._top(self.calls, "CALLS_Trade_Value", n)
+
+    def top_puts(self, n=10):
+        return self._top(self.puts, "PUTS_Trade_Value", n)
+
+
+# -------------------------
+# Helper: adaptive concurrent scanner
+# -------------------------
+class AdaptiveLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    Grows by one after each fast success and halves after a failure or a
+    slow response, so a throttling upstream is backed off automatically.
+    """
+
+    def __init__(self, initial=8, minimum=2, maximum=32, slow_after=5.0):
+        self.value = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slow_after = slow_after
+
+    def record(self, ok, seconds):
+        if ok and seconds < self.slow_after:
+            self.value = min(self.maximum, self.value + 1)
+        else:
+            self.value = max(self.minimum, self.value // 2)
+
+
+def scan_option_chains(symbols, ltp_fn=yf_ltp, chain_fn=nse_option_chain, deadline=20.0,
+                       initial_concurrency=8, max_concurrency=32, max_abandoned=None):
+    """Scan every symbol's live option chain, yielding results as symbols complete.
+
+    Yields ``(symbol, call_values, put_values, error)``; the value dicts map
+    ``Symbol`` to traded value and are empty when ``error`` is set.  A symbol
+    still running ``deadline`` seconds after its worker picked it up is
+    reported as timed out and no longer waited for.
+
+    A timed-out request can't be stopped, so its thread is abandoned to one
+    of ``max_abandoned`` (default ``max_concurrency``) spare threads; symbols
+    are only submitted while a thread is free, so none waits in the pool's
+    queue with its clock running.  Once more requests are stuck than there
+    are spare threads, the symbols not started yet are reported as failed.
+    """
+    limit = AdaptiveLimit(initial=initial_concurrency, maximum=max_concurrency)
+    max_abandoned = max_concurrency if max_abandoned is None else max_abandoned
+    began = {}
+
+    def work(key, symbol):
+        began[key] = time.monotonic()
+        ltp = ltp_fn(symbol)
+        if ltp is None:
+            raise ValueError("No LTP")
+        return symbol_trade_values(chain_fn(symbol), ltp)
+
+    def elapsed(key, now):
+        return now - began.get(key, now)
+
+    queue = list(enumerate(symbols))[::-1]
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency + max_abandoned)
+    started = {}
+    abandoned = set()
+    try:
+        while queue or started:
+            abandoned = {future for future in abandoned if not future.done()}
+            if len(abandoned) > max_abandoned:
+                while queue:
+                    _, symbol = queue.pop()
+                    yield symbol, {}, {}, f"Not scanned: {len(abandoned)} requests stuck for over {deadline}s"
+                if not started:
+                    break
+            while queue and len(started) < limit.value:
+                key, symbol = queue.pop()
+                started[executor.submit(work, key, symbol)] = (key, symbol)
+
+            done, _ = concurrent.futures.wait(
+                started, timeout=0.25, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            now = time.monotonic()
+            for future in done:
+                key, symbol = started.pop(future)
+                try:
+                    call_values, put_values = future.result()
+                except Exception as e:
+                    limit.record(False, elapsed(key, now))
+                    yield symbol, {}, {}, f"{type(e).__name__}: {e}"
+                else:
+                    limit.record(True, elapsed(key, now))
+                    yield symbol, call_values, put_values, None
+
+            now = time.monotonic()
+            for future, (key, symbol) in list(started.items()):
+                if elapsed(key, now) > deadline:
+                    del started[future]
+                    abandoned.add(future)
+                    limit.record(False, elapsed(key, now))
+                    yield symbol, {}, {}, f"Timed out after {deadline}s"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
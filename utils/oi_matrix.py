@@ -0,0 +1,110 @@
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.atomic_write import atomic_write
+
+
+DEFAULT_MATRIX_DIR = Path(os.environ.get(
+    "OI_MATRIX_DIR", Path(__file__).resolve().parent.parent / ".cache" / "oi_matrix"
+))
+ROW_KEYS = ["StrkPric", "OptnTp"]
+
+
+def _write_parquet(df, path):
+    with atomic_write(path) as tmp:
+        df.to_parquet(tmp)
+
+
+# -------------------------
+# Helper: incremental strike x date matrix
+# -------------------------
+class StrikeDateMatrix:
+    """Traded value per (strike, option type) x trade date with its day-on-day % change.
+
+    Adding a day inserts one column and computes the % change of that column
+    (and of the column after it, when a day is back-filled) instead of
+    re-pivoting and re-running ``pct_change`` over the whole history.
+    """
+
+    def __init__(self, values=None, pct=None):
+        empty = pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=ROW_KEYS), dtype=float)
+        self.values = empty if values is None else values
+        self.pct = empty.copy() if pct is None else pct
+
+    @property
+    def dates(self):
+        return list(self.values.columns)
+
+    @staticmethod
+    def _pct_change(values, i):
+        if i == 0:
+            return np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.round((values[:, i] / values[:, i - 1] - 1) * 100, 2)
+
+    def add_day(self, date, frame, value="total_traded_value"):
+        """Add (or replace) the column for ``date`` from rows with ``StrkPric``/``OptnTp``/``value``."""
+        date = f"{pd.Timestamp(date):%Y-%m-%d}"
+        column = frame.groupby(ROW_KEYS)[value].mean()
+
+        # One reindex into a plain array per frame instead of inserting
+        # columns, which would leave both frames fragmented over a long build
+        rows = self.values.index.union(column.index)
+        columns = sorted(set(self.values.columns) | {date})
+        i = columns.index(date)
+        values = self.values.reindex(index=rows, columns=columns).to_numpy(dtype=float, copy=True)
+        values[:, i] = column.reindex(rows).to_numpy(dtype=float)
+        pct = self.pct.reindex(index=rows, columns=columns).to_numpy(dtype=float, copy=True)
+        for j in (i, i + 1):
+            if j < len(columns):
+                pct[:, j] = self._pct_change(values, j)
+
+        self.values = pd.DataFrame(values, index=rows, columns=columns)
+        self.pct = pd.DataFrame(pct, index=rows, columns=columns)
+        return self
+
+    def heatmap(self, option_type, start=None, end=None, max_columns=None):
+        """% change for one option type as a Strike x Date frame, optionally limited to a date range.
+
+        With ``max_columns``, long ranges are binned by ``chart_data.bin_heatmap``
+        from the underlying values.
+        """
+        from utils.chart_data import bin_heatmap
+
+        cols = [c for c in self.pct.columns
+                if (start is None or c >= f"{pd.Timestamp(start):%Y-%m-%d}")
+                and (end is None or c <= f"{pd.Timestamp(end):%Y-%m-%d}")]
+        values = self.values.xs(option_type, level="OptnTp")
+        # Keep the strikes traded somewhere in the range, like a pivot over those days would
+        traded = values[cols].notna().any(axis=1)
+        pct = self.pct.xs(option_type, level="OptnTp")[cols][traded]
+        if max_columns is None:
+            return pct
+        first = self.values.columns.get_loc(cols[0]) if cols else 0
+        base = values.iloc[:, first - 1][traded] if first > 0 else None
+        return bin_heatmap(values[cols][traded], pct, max_columns, base=base)
+
+    def copy(self):
+        return StrikeDateMatrix(self.values.copy(), self.pct.copy())
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        try:
+            return cls(pd.read_parquet(path / "values.parquet"), pd.read_parquet(path / "pct.parquet"))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path):
+        path = Path(path)
+        _write_parquet(self.values, path / "values.parquet")
+        _write_parquet(self.pct, path / "pct.parquet")
+
+
+def matrix_path(symbol, expiry, metric, root=DEFAULT_MATRIX_DIR):
+    key = re.sub(r"[^A-Za-z0-9_-]+", "_", f"{symbol}_{expiry}_{metric}")
+    return Path(root) / key
@@ -0,0 +1,146 @@
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from utils.trade_ledger import content_hash
+
+
+DEFAULT_MAX_FILES = 8
+# Values openpyxl gives for error cells when reading values only; read_excel makes them NaN
+EXCEL_ERRORS = frozenset(("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"))
+
+
+# -------------------------
+# Helper: POS workbook cells
+# -------------------------
+def _is_xlsx(data):
+    if data[:4] != b"PK\x03\x04":
+        return False
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return "xl/workbook.xml" in archive.namelist()
+
+
+def _cell(value):
+    # Same conversions as pandas' openpyxl reader, from plain values instead of cell objects
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in EXCEL_ERRORS:
+        return np.nan
+    return value
+
+
+def _xlsx_grid(data):
+    import openpyxl
+
+    book = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = book.worksheets[0]
+        sheet.reset_dimensions()  # some writers store a wrong sheet size
+        grid = []
+        last_row_with_data = -1
+        for row in sheet.iter_rows(values_only=True):
+            cells = [_cell(value) for value in row]
+            while cells and cells[-1] == "":
+                cells.pop()
+            if cells:
+                last_row_with_data = len(grid)
+            grid.append(cells)
+    finally:
+        book.close()
+    return grid[:last_row_with_data + 1]
+
+
+def _pad(grid):
+    width = max((len(row) for row in grid), default=0)
+    return [tuple(row) + ("",) * (width - len(row)) for row in grid]
+
+
+def read_pos_grid(data):
+    """Cell values of the first sheet of a POS workbook (``bytes``) as a list of row tuples.
+
+    ``.xlsx`` files are streamed with openpyxl's read-only reader, taking
+    plain cell values instead of cell objects; other formats (``.xls``) go
+    through ``pd.read_excel`` once without a header.  Cells are converted
+    the way ``read_excel`` does, so the grid can be given any header later.
+    """
+    if _is_xlsx(data):
+        return _pad(_xlsx_grid(data))
+    raw = pd.read_excel(io.BytesIO(data), header=None, dtype=object, na_filter=False)
+    return [tuple(row) for row in raw.itertuples(index=False)]
+
+
+def grid_frame(grid, header=0, index_col=None):
+    """``pd.read_excel(..., header=header, index_col=index_col)`` of an already read grid."""
+    if not grid:
+        return pd.DataFrame()
+    parser = TextParser([list(row) for row in grid], header=header, index_col=index_col, skip_blank_lines=False)
+    return parser.read()
+
+
+# -------------------------
+# Helper: in-process POS parse cache
+# -------------------------
+class PosReader:
+    """POS workbooks parsed once per content, shared by every page and rerun.
+
+    Keyed by the SHA-256 of the upload, the reader keeps the sheet's cell
+    grid and each frame built from it (one per ``header``/``index_col``
+    layout a page asks for) for the ``max_files`` most recently used
+    workbooks.  Callers get copies, so they are free to modify them.
+    """
+
+    def __init__(self, max_files=DEFAULT_MAX_FILES):
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+
+    def _entry(self, data):
+        digest = content_hash(data)
+        with self._lock:
+            entry = self._files.get(digest)
+            if entry is not None:
+                self._files.move_to_end(digest)
+                return entry
+        entry = {"grid": read_pos_grid(data), "frames": {}}
+        with self._lock:
+            entry = self._files.setdefault(digest, entry)
+            self._files.move_to_end(digest)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+        return entry
+
+    def read(self, data, header=0, index_col=None):
+        """Frame of the POS workbook ``data`` as ``pd.read_excel(header=..., index_col=...)`` reads it."""
+        entry = self._entry(data)
+        key = (header, index_col)
+        df = entry["frames"].get(key)
+        if df is None:
+            df = entry["frames"].setdefault(key, grid_frame(entry["grid"], header, index_col))
+        return df.copy()
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+_default_reader = None
+
+
+def get_pos_reader():
+    """Shared process-wide POS reader."""
+    global _default_reader
+    if _default_reader is None:
+        _default_reader = PosReader()
+    return _default_reader
+
+
+def read_pos(data, header=0, index_col=None):
+    """``PosReader.read`` on the shared reader."""
+    return get_pos_reader().read(data, header=header, index_col=index_col)
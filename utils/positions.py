@@ -0,0 +1,193 @@
+import pandas as pd
+
+
+ABSOLUTE_MODE = "Absolute Range"
+ATM_COLUMNS = ['Scrip', 'Call/Put', 'Exp Date', 'STK', 'Net Qty']
+
+
+# -------------------------
+# Helper: at-the-money option legs
+# -------------------------
+def futures_ltp(fut):
+    """LTP of the first futures row of each scrip."""
+    fut = fut[fut['Scrip'].notna()]
+    return fut.drop_duplicates('Scrip').set_index('Scrip')['LTP']
+
+
+def atm_positions(data, atm_value, mode):
+    """Open out-of-the-money option legs within ``atm_value`` of their future's LTP.
+
+    ``mode`` is ``ABSOLUTE_MODE`` (``atm_value`` in points) or a percentage of
+    the LTP.  A CE counts below the LTP and a PE above it; options whose
+    scrip has no future are skipped.  Rows keep the POS file order.
+    """
+    data = data[data['Net Qty'] != 0]
+    fut = data[data['Call/Put'] == 'FF']
+    opt = data[data['Call/Put'] != 'FF']
+
+    ltp = opt['Scrip'].map(futures_ltp(fut))
+    threshold = atm_value if mode == ABSOLUTE_MODE else ltp * (atm_value / 100)
+    near = (opt['STK'] - ltp).abs() < threshold
+    otm = (
+        ((opt['STK'] < ltp) & (opt['Call/Put'] == 'CE')) |
+        ((opt['STK'] > ltp) & (opt['Call/Put'] == 'PE'))
+    )
+    return opt[near & otm].reset_index(drop=True)
+
+
+# -------------------------
+# Helper: POS header detection and position rows
+# -------------------------
+POS_KEYWORDS = ['CE', 'PE', 'FX']
+# Named column -> header labels it goes by (compared case-insensitively)
+POS_HEADERS = {
+    'stock': ('symbol', 'scrip', 'stock', 'underlying'),
+    'strike': ('strike', 'strike price', 'strk', 'stk'),
+    'leg': ('type', 'inst type', 'instrument type', 'call/put', 'option type', 'opt type'),
+    'net_qty': ('net qty', 'net quantity', 'netqty', 'net pos'),
+    'exposure': ('exposure', 'net value', 'net exposure'),
+    'm2m': ('m2m', 'mtm', 'm2m pnl'),
+}
+REQUIRED_POS_COLUMNS = ['stock', 'strike', 'leg', 'net_qty', 'exposure']
+HEADER_SEARCH_ROWS = 20
+# The combined net position export: only the strike column has a title
+# ("COMBINED NET POSITION", the sheet's first row), the rest sit at fixed positions
+COMBINED_NET_POSITION = 'COMBINED NET POSITION'
+COMBINED_NET_POSITION_LAYOUT = {'stock': 0, 'leg': 7, 'net_qty': 9, 'exposure': 15, 'm2m': 17}
+NUMERIC_POS_COLUMNS = ['net_qty', 'exposure', 'm2m']
+
+
+def _label(cell):
+    return str(cell).strip().lower() if isinstance(cell, str) else None
+
+
+def _header_positions(cells):
+    # {name: position} of the POS_HEADERS labels found in one row
+    labels = {label: name for name, names in POS_HEADERS.items() for label in names}
+    found = {}
+    for i, cell in enumerate(cells):
+        name = labels.get(_label(cell))
+        if name is not None and name not in found:
+            found[name] = i
+    return found
+
+
+def find_pos_header(df, search_rows=HEADER_SEARCH_ROWS):
+    """``({name: column position}, header row)`` of a POS sheet read with ``header=0``.
+
+    The header row is the one among the column labels and the first
+    ``search_rows`` rows holding the most ``POS_HEADERS`` labels (row -1 is
+    the column labels).  A combined net position export, whose only title is
+    ``COMBINED NET POSITION`` over the strikes, is recognised by that title.
+    Raises ``ValueError`` naming the required columns that can't be found.
+    """
+    candidates = [(-1, list(df.columns))] + [
+        (i, list(row)) for i, row in enumerate(df.head(search_rows).itertuples(index=False))
+    ]
+    row, found = max(((i, _header_positions(cells)) for i, cells in candidates), key=lambda c: len(c[1]))
+
+    missing = [name for name in REQUIRED_POS_COLUMNS if name not in found]
+    if missing and COMBINED_NET_POSITION in df.columns:
+        layout = dict(COMBINED_NET_POSITION_LAYOUT, strike=list(df.columns).index(COMBINED_NET_POSITION))
+        if max(layout.values()) < df.shape[1]:
+            return layout, -1
+    if missing:
+        expected = "; ".join(f"{name} ({' / '.join(POS_HEADERS[name])})" for name in missing)
+        raise ValueError(f"Not a POS position sheet, no header found for: {expected}")
+    return found, row
+
+
+def position_rows(df, keywords=POS_KEYWORDS):
+    """POS rows holding a CE/PE/FX cell, plus their named and typed columns.
+
+    Returns ``(rows, positions)``: ``rows`` are the matching sheet rows with
+    every column that has a blank among them dropped, ``positions`` the
+    columns found by ``find_pos_header`` for those rows under their names,
+    with quantities and values as numbers.  Strikes are numbers where they
+    parse and keep their text otherwise, so no position is lost.  Both are
+    empty if no row matches.
+    """
+    layout, header_row = find_pos_header(df)
+    matches = df.isin(keywords)
+    if header_row >= 0:
+        matches.iloc[:header_row + 1] = False
+    selected = df[matches.any(axis=1)]
+
+    rows = selected.infer_objects().dropna(axis=1).reset_index(drop=True)
+
+    positions = pd.DataFrame(
+        {name: selected.iloc[:, layout[name]].to_numpy() for name in POS_HEADERS if name in layout}
+    ).infer_objects()
+    for name in NUMERIC_POS_COLUMNS:
+        if name in positions:
+            positions[name] = pd.to_numeric(positions[name], errors='coerce')
+    strike = pd.to_numeric(positions['strike'], errors='coerce')
+    positions['strike'] = strike.where(strike.notna() | positions['strike'].isna(), positions['strike'])
+    return rows, positions
+
+
+def text_strikes(positions):
+    """Option rows whose strike is text rather than a number."""
+    options = positions[positions['leg'].isin(['CE', 'PE'])]
+    return options[options['strike'].map(lambda v: isinstance(v, str))]
+
+
+# -------------------------
+# Helper: CE/PE/FX reconciliation
+# -------------------------
+LEGS = ['CE', 'PE', 'FX']
+STRIKE_MISMATCH_COLUMNS = ['Stock', 'Strike', 'CE Quantity', 'PE Quantity', 'FX Quantity']
+FUTURE_MISMATCH_COLUMNS = ['stock', 'net fx quantity', 'net ce quantity']
+STOCK_SUMMARY_COLUMNS = ['stock', 'fx_qty', 'ce_qty', 'pe_qty', 'unbalanced_strikes', 'fx_mismatch']
+
+
+def reconcile_positions(positions):
+    """CE/PE strike mismatches, FX mismatches and a per-stock summary of ``position_rows`` output.
+
+    Net quantity is summed per (stock, strike, leg) in one groupby; every
+    table is derived from that with column arithmetic.  A strike is
+    mismatched when its CE and PE quantities don't cancel.  A stock's
+    futures are mismatched when its total CE quantity doesn't cancel its FX
+    quantity; like the per-stock check this replaces, that is only reported
+    for stocks with at least one balanced strike.  Stocks keep their order
+    in the file and strikes are ascending, with text strikes last.
+    """
+    legs = positions[positions['leg'].isin(LEGS) & positions['stock'].notna()]
+    stocks = pd.Index(legs['stock'].unique(), name='stock')
+
+    # Unsorted: strikes kept as text can't be compared with numeric ones
+    totals = legs.groupby(['stock', 'strike', 'leg'], dropna=False, sort=False)['net_qty'].agg(['sum', 'size'])
+    qty = totals['sum'].unstack('leg', fill_value=0).reindex(columns=LEGS, fill_value=0)
+    option_rows = totals['size'].unstack('leg', fill_value=0).reindex(columns=['CE', 'PE'], fill_value=0).sum(axis=1)
+
+    by_stock = qty.groupby(level='stock').sum().reindex(stocks, fill_value=0)
+
+    # Strikes traded in options, stocks in file order
+    strikes = qty[(option_rows > 0) & qty.index.get_level_values('strike').notna()].reset_index()
+    strikes['order'] = stocks.get_indexer(strikes['stock'])
+    strikes['strike_order'] = pd.to_numeric(strikes['strike'], errors='coerce')  # text strikes last
+    strikes = strikes.sort_values(['order', 'strike_order'], kind='stable').reset_index(drop=True)
+    strikes['fx_qty'] = strikes['stock'].map(by_stock['FX'])
+    unbalanced = strikes['CE'] + strikes['PE'] != 0
+
+    strike_mismatch = strikes.loc[unbalanced, ['stock', 'strike', 'CE', 'PE', 'fx_qty']]
+    strike_mismatch.columns = STRIKE_MISMATCH_COLUMNS
+
+    summary = pd.DataFrame({
+        'stock': stocks,
+        'fx_qty': by_stock['FX'].to_numpy(),
+        'ce_qty': by_stock['CE'].to_numpy(),
+        'pe_qty': by_stock['PE'].to_numpy(),
+        'unbalanced_strikes': unbalanced.groupby(strikes['stock']).sum().reindex(stocks, fill_value=0).to_numpy(),
+        'fx_mismatch': (by_stock['CE'] + by_stock['FX'] != 0).to_numpy(),
+    })
+    balanced = strikes.loc[~unbalanced, 'stock'].unique()
+    future_mismatch = summary[summary['fx_mismatch'] & summary['stock'].isin(balanced)]
+    future_mismatch = future_mismatch[['stock', 'fx_qty', 'ce_qty']]
+    future_mismatch.columns = FUTURE_MISMATCH_COLUMNS
+
+    return (
+        strike_mismatch.reset_index(drop=True),
+        future_mismatch.reset_index(drop=True),
+        summary[STOCK_SUMMARY_COLUMNS],
+    )
@@ -0,0 +1,118 @@
+import collections
+import concurrent.futures
+import io
+import threading
+import time
+import urllib.request
+
+import pandas as pd
+
+from utils.bhavcopy_cache import get_cache
+
+
+# -------------------------
+# Helper: shared request rate limiter
+# -------------------------
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls per second with bursts up to ``burst``."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def http_fetcher(base_url, timeout=30):
+    """Fetcher reading ``{base_url}/{dd-mm-YYYY}.csv``, e.g. from a local stub server for benchmarks."""
+    def fetch(date):
+        url = f"{base_url.rstrip('/')}/{date:%d-%m-%Y}.csv"
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return pd.read_csv(io.BytesIO(resp.read()))
+    return fetch
+
+
+# -------------------------
+# Helper: concurrent Bhavcopy prefetch
+# -------------------------
+def prefetch_bhavcopies(dates, cache=None, max_workers=4, rate=2.0, timeout=60, max_hung=None):
+    """Fetch the Bhavcopy of every date concurrently, yielding as each one arrives.
+
+    Yields ``(date, df, error)`` tuples in completion order; exactly one of
+    ``df`` / ``error`` is set.  Days already on disk are read straight from the
+    cache, only real downloads go through the ``rate`` (requests per second)
+    limiter.
+
+    A day still loading ``timeout`` seconds after its worker picked it up is
+    reported as failed and abandoned.  The NSE fetcher has no timeout of its
+    own and a thread can't be stopped, so an abandoned download keeps one of
+    ``max_hung`` (default ``max_workers``) spare threads until it returns and
+    the other days carry on.  Days are only handed out while a thread is
+    free, and their clock starts when the worker picks them up.  Once more
+    downloads hang than there are spare threads, the days not started yet are
+    reported as failed instead of waiting behind them.
+    """
+    cache = cache or get_cache()
+    limiter = RateLimiter(rate)
+    queue = collections.deque(enumerate(pd.Timestamp(date).date() for date in dates))
+    started = {}
+
+    def load(position, date):
+        started[position] = time.monotonic()
+        if date not in cache:
+            limiter.acquire()
+        return cache.get(date)
+
+    max_hung = max_workers if max_hung is None else max_hung
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers + max_hung)
+    try:
+        active = {}
+        abandoned = set()
+        while queue or active:
+            abandoned = {future for future in abandoned if not future.done()}
+            if len(abandoned) > max_hung:
+                while queue:
+                    _, date = queue.popleft()
+                    yield date, None, f"Not fetched: {len(abandoned)} downloads hung for over {timeout}s"
+                if not active:
+                    break
+            while queue and len(active) < max_workers:
+                position, date = queue.popleft()
+                active[executor.submit(load, position, date)] = (position, date)
+
+            done, _ = concurrent.futures.wait(
+                active, timeout=1.0, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                _, date = active.pop(future)
+                try:
+                    yield date, future.result(), None
+                except Exception as e:
+                    yield date, None, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+            now = time.monotonic()
+            expired = [
+                future for future, (position, _) in active.items()
+                if position in started and now - started[position] > timeout
+            ]
+            for future in expired:
+                _, date = active.pop(future)
+                abandoned.add(future)
+                yield date, None, f"Timed out after {timeout}s"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
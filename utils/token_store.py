@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.atomic_write import write_text_atomic
+from utils.bhavcopy_cache import get_bhavcopy, get_instruments
+from utils.tokens import run_analysis
+from utils.trading_calendar import previous_trading_day
+
+
+DEFAULT_STORE_DIR = Path(os.environ.get(
+    "TOKEN_STORE_DIR", Path(__file__).resolve().parent.parent / ".cache" / "tokens"
+))
+
+
+# -------------------------
+# Helper: generated token sets per (date, month, parameters)
+# -------------------------
+def _path(date, month, oi_threshold, atm_percentage, root=DEFAULT_STORE_DIR):
+    return Path(root) / f"{pd.Timestamp(date):%Y-%m-%d}_{month}_oi{oi_threshold}_atm{atm_percentage}.txt"
+
+
+def save_token_set(date, month, oi_threshold, atm_percentage, tokens, root=DEFAULT_STORE_DIR):
+    path = _path(date, month, oi_threshold, atm_percentage, root)
+    write_text_atomic(path, "\n".join(tokens))
+    return path
+
+
+def load_token_set(date, month, oi_threshold, atm_percentage, root=DEFAULT_STORE_DIR):
+    path = _path(date, month, oi_threshold, atm_percentage, root)
+    if not path.exists():
+        return None
+    text = path.read_text(encoding="utf-8")
+    return np.array(text.split("\n") if text else [], dtype=object)
+
+
+def previous_token_set(date, month, oi_threshold, atm_percentage, root=DEFAULT_STORE_DIR):
+    """Token set of the previous trading day, generated and stored if it is missing."""
+    prev = previous_trading_day(date)
+    if prev is None:
+        return prev, None
+    tokens = load_token_set(prev, month, oi_threshold, atm_percentage, root)
+    if tokens is not None:
+        return prev, tokens
+    try:
+        result_df, _ = run_analysis(
+            prev.strftime("%Y-%m-%d"), month, oi_threshold, atm_percentage,
+            fallback_data=get_bhavcopy(prev), instruments=get_instruments(prev)
+        )
+    except Exception:
+        return prev, None
+    if result_df is None:
+        # Nothing was generated (missing data, no contracts): don't store an
+        # empty set that later diffs would read as "every token added"
+        return prev, None
+    tokens = np.array(result_df["All Columns"].tolist(), dtype=object)
+    save_token_set(prev, month, oi_threshold, atm_percentage, tokens, root)
+    return prev, tokens
+
+
+def is_bhavcopy_for(df, date):
+    """Whether every row of the Bhavcopy ``df`` is from the trading date ``date``."""
+    if df is None or "TradDt" not in df or df.empty:
+        return False
+    dates = pd.to_datetime(pd.Series(df["TradDt"].astype(str).unique()), errors="coerce")
+    return dates.notna().all() and (dates.dt.date == pd.Timestamp(date).date()).all()
+
+
+def diff_tokens(current, previous, sort_ascending=True):
+    """Tokens added to and removed from ``previous`` to get ``current``.
+
+    Returns a frame with a ``Change`` column (``added``/``removed``) and the
+    token in ``All Columns``.
+    """
+    current = np.asarray(current, dtype=object)
+    previous = np.asarray(previous, dtype=object)
+    added = current[~np.isin(current, previous)]
+    removed = previous[~np.isin(previous, current)]
+    diff = pd.DataFrame({
+        "Change": ["added"] * len(added) + ["removed"] * len(removed),
+        "All Columns": np.concatenate([added, removed]),
+    })
+    return diff.sort_values(["Change", "All Columns"], ascending=[True, sort_ascending], ignore_index=True)
+
+
+def diff_text(diff):
+    """``+token`` / ``-token`` lines for order systems that apply incremental updates."""
+    sign = np.where(diff["Change"] == "added", "+", "-")
+    return "\n".join((sign + diff["All Columns"].astype(str)).tolist())
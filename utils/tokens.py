@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from utils.instruments import build_instrument_index, contains
+
+
+# -------------------------
+# Helper: vectorized token engine
+# -------------------------
+def build_tokens(data, month, oi_threshold, atm_percentage, instruments=None):
+    """Split a Bhavcopy into CE, PE and FUT token series for one expiry month.
+
+    ``instruments`` is the parsed index from :func:`build_instrument_index`;
+    pass the cached one to avoid re-parsing ``FinInstrmNm`` on every call.
+
+    Returns ``(ce, pe, fut, counts)`` where ``counts`` holds the number of rows
+    surviving the month, ITM and OI stages, used for the "no data" messages of
+    :func:`run_analysis`.
+    """
+    if instruments is None:
+        instruments = build_instrument_index(data)
+    underlying = instruments["underlying"]
+
+    # Same matches as a substring search on the raw name: the month code or a
+    # symbol containing it (e.g. MARUTI for MAR)
+    month_code = (instruments["month"] == month).to_numpy()
+    in_month = month_code | contains(underlying, month)
+    is_fut = (month_code & (instruments["option_type"] == "FUT").to_numpy()) | contains(underlying, f"{month}FUT")
+    # Index products (NIFTY, BANKNIFTY, FINNIFTY ...) and decimal strikes are not tokenised
+    tradable = ~(contains(underlying, "NIFTY") | contains(underlying, ".") | instruments["fractional_strike"].to_numpy())
+
+    strike = data["StrkPric"].to_numpy(dtype=float, na_value=np.nan)
+    under = data["UndrlygPric"].to_numpy(dtype=float, na_value=np.nan)
+    opt_type = data["OptnTp"].to_numpy()
+    open_int = (data["OpnIntrst"] / data["NewBrdLotQty"]).to_numpy(dtype=float, na_value=np.nan)
+
+    # ITM legs: puts above the underlying, calls below it
+    itm = in_month & (
+        ((strike >= under) & (opt_type == "PE"))
+        | ((strike <= under) & (opt_type == "CE"))
+    )
+
+    # Inside the ATM band everything is kept, outside only high-OI strikes
+    atm_decimal = atm_percentage / 100
+    outside_band = (strike <= under - (atm_decimal * under)) | (strike >= under + (atm_decimal * under))
+    keep = itm & (~outside_band | (open_int > oi_threshold))
+
+    names = data["FinInstrmNm"].astype(str)
+    base = names[keep & tradable].str[:-2]
+    fut = names[is_fut & tradable]
+
+    counts = (int(in_month.sum()), int(itm.sum()), int(keep.sum()))
+    return "NRML|" + base + "CE", "NRML|" + base + "PE", "NRML|" + fut, counts
+
+
+# Main logic function
+def run_analysis(date_str, month, oi_threshold, atm_percentage, fallback_data, sort_ascending=True, instruments=None):
+    try:
+        ce, pe, fut, (n_month, n_itm, n_kept) = build_tokens(
+            fallback_data, month, oi_threshold, atm_percentage, instruments=instruments
+        )
+
+        if n_month == 0:
+            return None, f"No contracts found for {month}."
+        if n_itm == 0:
+            return None, "No matching data after applying filters."
+        if n_kept == 0:
+            return None, "No data after applying OI threshold filter."
+
+        tokens = np.concatenate([ce.to_numpy(), pe.to_numpy(), fut.to_numpy()])
+        df5 = pd.DataFrame({"All Columns": tokens})
+        df5 = df5.sort_values(by="All Columns", ascending=sort_ascending)
+
+        return df5, None
+
+    except Exception as e:
+        return None, f"Error: {str(e)}"
@@ -0,0 +1,135 @@
+import concurrent.futures
+import io
+import os
+import time
+import zipfile
+
+import pandas as pd
+
+from utils.trade_log import trade_log_pnl
+from utils.trade_ledger import content_hash
+
+
+ARCHIVE_TYPES = ("zip", "rar")
+LEDGER_KIND = "stock_box_pnl-v1"
+
+
+# -------------------------
+# Helper: archive members
+# -------------------------
+def _file_type(name):
+    return name.rsplit(".", 1)[-1].lower()
+
+
+def _open_archive(name, data):
+    file_type = _file_type(name)
+    if file_type not in ARCHIVE_TYPES:
+        raise ValueError(f"Unsupported file type: .{file_type}")
+    if file_type == "zip":
+        return zipfile.ZipFile(io.BytesIO(data))
+    try:
+        import rarfile  # optional, and needs an unrar/unar/bsdtar tool on PATH
+    except ImportError:
+        raise RuntimeError("RAR support needs the 'rarfile' package (pip install rarfile)") from None
+    return rarfile.RarFile(io.BytesIO(data))
+
+
+def trade_file_names(name, data):
+    """Names of the trade logs in one upload, read from the archive directory only."""
+    file_type = _file_type(name)
+    if file_type == "txt":
+        return [name]
+    with _open_archive(name, data) as archive:
+        return [member for member in archive.namelist() if member.endswith(".txt")]
+
+
+def iter_trade_files(name, data):
+    """Yield ``(name, bytes)`` for every trade log in a .txt/.zip/.rar upload.
+
+    Archive members are decompressed one at a time as the caller asks for
+    them.
+    """
+    if _file_type(name) == "txt":
+        yield name, data
+        return
+    with _open_archive(name, data) as archive:
+        for member in archive.namelist():
+            if member.endswith(".txt"):
+                yield member, archive.read(member)
+
+
+# -------------------------
+# Helper: parallel parsing
+# -------------------------
+def parse_trade_file(data):
+    """Box PnL of one trade log plus the seconds it took (runs in a worker process)."""
+    started = time.perf_counter()
+    df = trade_log_pnl(io.BytesIO(data))
+    return df, time.perf_counter() - started
+
+
+def ingest_trade_files(uploads, max_workers=None, ledger=None):
+    """Parse every trade log in ``uploads`` across a process pool.
+
+    ``uploads`` is a list of ``(name, bytes)``.  Yields ``(position, name,
+    df, seconds, error, cached)`` in completion order, one per trade log (or
+    per unreadable upload), where ``position`` is the file's place in upload
+    order; exactly one of ``df`` / ``error`` is set.  At most two files per
+    worker are decompressed and in flight at a time.
+
+    With a ``ledger`` (see ``utils.trade_ledger``), files whose content was
+    parsed before are read back from it with ``cached`` set, and newly
+    parsed files are added to it.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    def members():
+        for upload_name, data in uploads:
+            try:
+                yield from iter_trade_files(upload_name, data)
+            except Exception as e:
+                yield upload_name, e
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        queue = enumerate(members())
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < 2 * max_workers:
+                position, (name, data) = next(queue, (None, (None, None)))
+                if position is None:
+                    exhausted = True
+                elif isinstance(data, Exception):
+                    yield position, name, None, 0.0, f"{type(data).__name__}: {data}", False
+                else:
+                    digest = content_hash(data)
+                    df = ledger.get(LEDGER_KIND, digest) if ledger is not None else None
+                    if df is not None:
+                        yield position, name, df, 0.0, None, True
+                    else:
+                        in_flight[executor.submit(parse_trade_file, data)] = (position, name, digest)
+            if not in_flight:
+                continue
+
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                position, name, digest = in_flight.pop(future)
+                try:
+                    df, seconds = future.result()
+                except Exception as e:
+                    yield position, name, None, 0.0, f"{type(e).__name__}: {e}", False
+                    continue
+                if ledger is not None:
+                    try:
+                        ledger.put(LEDGER_KIND, digest, df)
+                    except (OSError, ValueError, TypeError):
+                        pass
+                yield position, name, df, seconds, None, False
+
+
+def combine_results(frames):
+    """One ``pd.concat`` over the non-empty per-file frames (empty frame if none)."""
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,73 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.atomic_write import atomic_write
+
+
+DEFAULT_LEDGER_DIR = Path(os.environ.get(
+    "TRADE_LEDGER_DIR", Path(__file__).resolve().parent.parent / ".cache" / "ledger"
+))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# -------------------------
+# Helper: content-hashed ledger of parsed files
+# -------------------------
+class TradeLedger:
+    """Parsed trade/algo files stored as Parquet, keyed by the SHA-256 of the raw upload.
+
+    Re-uploading a file that was parsed before (under any name, in any
+    archive) reads its frame back instead of parsing it again.  ``kind``
+    names the parser and its version, e.g. ``"stock_box_pnl-v1"``; bump the
+    version when a parser's output changes so stale entries are ignored.
+    """
+
+    def __init__(self, root=DEFAULT_LEDGER_DIR):
+        self.root = Path(root)
+
+    def path_for(self, kind, digest):
+        return self.root / kind / f"{digest}.parquet"
+
+    def get(self, kind, digest):
+        path = self.path_for(kind, digest)
+        if not path.exists():
+            return None
+        try:
+            return pd.read_parquet(path)
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, kind, digest, df):
+        path = self.path_for(kind, digest)
+        with atomic_write(path) as tmp:
+            df.to_parquet(tmp, compression="zstd")
+
+    def get_or_parse(self, kind, data, parse):
+        """Frame for the raw bytes ``data``, running ``parse(data)`` only on a ledger miss."""
+        digest = content_hash(data)
+        df = self.get(kind, digest)
+        if df is None:
+            df = parse(data)
+            try:
+                self.put(kind, digest, df)
+            except (OSError, ValueError, TypeError):
+                pass  # an unwritable disk or a frame Parquet can't hold only costs the next re-parse
+        return df
+
+
+_default_ledger = None
+
+
+def get_ledger():
+    """Shared process-wide ledger at ``DEFAULT_LEDGER_DIR``."""
+    global _default_ledger
+    if _default_ledger is None:
+        _default_ledger = TradeLedger()
+    return _default_ledger
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+
+# Positional layout of the 26-column trade log and the 13 columns kept from it
+TRADE_LOG_COLUMNS = [
+    'abc', 'bce', 'symbol', 'cont_typ', 'expiry', 'strike', 'inst_type', 'inst_name', 'cef',
+    'efd', 'id', 'efg', 'buy_sell', 'quantity', 'price', 'ghi', 'mod', 'id_2', 'hij',
+    'datetime', 'datetime_02', 'xyz', 'pqr', 'stu', 'tqp', 'qwe',
+]
+TRADE_COLUMNS = ['symbol', 'cont_typ', 'expiry', 'strike', 'inst_type', 'inst_name', 'id',
+                 'buy_sell', 'quantity', 'price', 'id_2', 'datetime', 'datetime_02']
+CHUNK_ROWS = 250_000
+DATE_PATTERN = r'(\d{1,2}\s+[A-Za-z]{3}\s+\d{4})'
+
+LEG_KEYS = ["expiry", "symbol", "inst_type", "buy_sell"]
+OUTPUT_COLUMNS = ["date", "expiry", "stock", "net_quantity", "trade", "parity", "expense"]
+
+# Charges per leg as a fraction of price: (CE, PE, XX)
+OPEN_CHARGES = (0.00055, 0.001625, 0.00028118)
+CLOSE_CHARGES = (0.001625, 0.00055, 0.00005618)
+
+
+def round2(values):
+    """``round(v, 2)`` for a float array, matching Python's correctly rounded result.
+
+    ``np.round`` rounds ``v * 100`` and can land on the other side of a tie
+    (e.g. averaged prices ending in .xx5), so those few values go through
+    ``round`` instead.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    scaled = np.abs(values * 100)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, 2) for v in values[near_tie].tolist()]
+    return rounded
+
+
+# -------------------------
+# Helper: trade log parsing
+# -------------------------
+def parse_trade_dates(text):
+    """Trade date from ``datetime_02`` values like ``13 Mar 2025 9:27:00``.
+
+    The leading ``D Mon YYYY`` is parsed directly (a handful of distinct
+    values per file, so ``to_datetime`` caches them); anything else falls
+    back to pulling the first ``D Mon YYYY`` out of the text.
+    """
+    date = pd.to_datetime(text.str[:11].str.strip(), format="%d %b %Y", errors="coerce")
+    missing = date.isna() & text.notna()
+    if missing.any():
+        fallback = pd.to_datetime(
+            text[missing].str.extract(DATE_PATTERN, expand=False), format="%d %b %Y", errors="coerce"
+        )
+        date = date.fillna(fallback)
+    return date
+
+
+def _by_value(col, convert):
+    # Convert each distinct value once and broadcast back; trade logs repeat
+    # the same symbols, sides, quantities and prices over and over
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    return pd.Series(convert(pd.Series(uniques, dtype=object)).to_numpy()[codes], index=col.index)
+
+
+def _typed(chunk):
+    chunk = chunk[TRADE_COLUMNS].copy()
+    chunk['inst_type'] = _by_value(chunk['inst_type'], lambda v: v.astype(str).str.strip().str.upper())
+    chunk['buy_sell'] = _by_value(chunk['buy_sell'], lambda v: pd.to_numeric(v, errors='coerce').fillna(0).astype(int))
+    chunk['quantity'] = _by_value(chunk['quantity'], lambda v: pd.to_numeric(v, errors='coerce').fillna(0).astype(int))
+    chunk['price'] = _by_value(chunk['price'], lambda v: pd.to_numeric(v, errors='coerce'))
+    chunk['strike'] = _by_value(chunk['strike'], lambda v: pd.to_numeric(v, errors='coerce'))
+    chunk['date'] = parse_trade_dates(chunk['datetime_02'])
+    return chunk
+
+
+def read_trade_log(source, chunksize=None):
+    """Read the 26-column trade log, keeping only ``TRADE_COLUMNS`` plus a parsed ``date``.
+
+    Uses the C parser.  All fields are still tokenized because with
+    ``usecols`` it stops skipping lines that have too many fields; the
+    unused columns are dropped right away.  With ``chunksize`` an iterator
+    of typed frames is returned instead, so very large logs can be
+    processed in bounded memory.
+    """
+    reader = pd.read_csv(
+        source,
+        header=None,
+        names=TRADE_LOG_COLUMNS,
+        dtype=str,
+        engine="c",
+        low_memory=False,
+        on_bad_lines="skip",
+        chunksize=chunksize,
+    )
+    if chunksize is None:
+        return _typed(reader)
+    return (_typed(chunk) for chunk in reader)
+
+
+# -------------------------
+# Helper: box-trade pairing
+# -------------------------
+def leg_totals(df):
+    """Per-leg partial aggregates of trade rows, combinable across chunks.
+
+    Returns ``(legs, first_date)``: sums/counts per (expiry, symbol,
+    inst_type, buy_sell) with the first known trade date, and the date of
+    each expiry's first row in file order.
+    """
+    expiry_rows = df[df["expiry"].notna()]
+    first_date = expiry_rows.drop_duplicates("expiry").set_index("expiry")["date"]
+
+    df = expiry_rows[expiry_rows["symbol"].notna()]
+    legs = df.groupby(LEG_KEYS, sort=False).agg(
+        date=("date", "first"),
+        strike_sum=("strike", "sum"),
+        strike_count=("strike", "count"),
+        quantity=("quantity", "sum"),
+        price_sum=("price", "sum"),
+        price_count=("price", "count"),
+    )
+    return legs, first_date
+
+
+def combine_leg_totals(parts):
+    """Merge ``leg_totals`` results of consecutive chunks into one."""
+    parts = list(parts)
+    legs = pd.concat([legs for legs, _ in parts])
+    if len(parts) > 1:
+        agg = {col: "sum" for col in legs.columns}
+        agg["date"] = "first"
+        legs = legs.groupby(level=LEG_KEYS, sort=False).agg(agg)
+    first_date = pd.concat([first_date for _, first_date in parts])
+    return legs, first_date[~first_date.index.duplicated()]
+
+
+def pair_legs(legs, first_date):
+    """Pair each XX leg with its CE and PE legs and price the box.
+
+    An XX sell (``buy_sell == 2``) is an open paired with CE buy + PE sell,
+    anything else a close paired with CE sell + PE buy.  XX legs without both
+    partners are dropped.  Rows come out per expiry in file order, then
+    symbol and XX side.
+    """
+    if legs.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    legs = legs.reset_index()
+    legs["strike"] = legs["strike_sum"] / legs["strike_count"]
+    legs["price"] = legs["price_sum"] / legs["price_count"]
+
+    xx = legs[legs["inst_type"] == "XX"]
+    is_open = (xx["buy_sell"] == 2).to_numpy()
+    xx = xx.assign(
+        ce_side=np.where(is_open, 1, 2),
+        pe_side=np.where(is_open, 2, 1),
+        is_open=is_open,
+    )
+
+    ce = legs.loc[legs["inst_type"] == "CE", ["expiry", "symbol", "buy_sell", "price", "strike"]]
+    pe = legs.loc[legs["inst_type"] == "PE", ["expiry", "symbol", "buy_sell", "price", "quantity"]]
+    boxes = xx.merge(
+        ce.rename(columns={"buy_sell": "ce_side", "price": "ce_price", "strike": "ce_strike"}),
+        on=["expiry", "symbol", "ce_side"],
+    ).merge(
+        pe.rename(columns={"buy_sell": "pe_side", "price": "pe_price", "quantity": "pe_quantity"}),
+        on=["expiry", "symbol", "pe_side"],
+    )
+    if boxes.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    boxes["expiry"] = pd.Categorical(boxes["expiry"], categories=first_date.index, ordered=True)
+    boxes = boxes.sort_values(["expiry", "symbol", "buy_sell"], kind="stable").reset_index(drop=True)
+    boxes["expiry"] = boxes["expiry"].astype(object)
+
+    is_open = boxes["is_open"].to_numpy()
+    ce_price, pe_price, xx_price = boxes["ce_price"], boxes["pe_price"], boxes["price"]
+    parity = np.where(
+        is_open,
+        (ce_price - pe_price - xx_price).abs() - boxes["ce_strike"],
+        -(-ce_price + pe_price + xx_price).abs() + boxes["ce_strike"],
+    )
+    expense = np.where(
+        is_open,
+        ce_price * OPEN_CHARGES[0] + pe_price * OPEN_CHARGES[1] + xx_price * OPEN_CHARGES[2],
+        ce_price * CLOSE_CHARGES[0] + pe_price * CLOSE_CHARGES[1] + xx_price * CLOSE_CHARGES[2],
+    )
+
+    # Boxes without an XX date fall back to the expiry's first trade date
+    date = boxes["date"].fillna(boxes["expiry"].map(first_date))
+
+    return pd.DataFrame({
+        "date": date,
+        "expiry": boxes["expiry"],
+        "stock": boxes["symbol"],
+        "net_quantity": boxes["pe_quantity"].astype(int),
+        "trade": np.where(is_open, "open", "close"),
+        "parity": round2(parity),
+        "expense": round2(expense),
+    })
+
+
+def pair_box_trades(df):
+    """``pair_legs`` over one frame of typed trade rows."""
+    return pair_legs(*leg_totals(df))
+
+
+def _with_pnl(df_out):
+    if df_out.empty:
+        return pd.DataFrame()
+
+    df_out['pnl'] = (df_out['parity'] - df_out['expense']) * df_out['net_quantity']
+    df_out['date'] = pd.to_datetime(df_out['date'], errors='coerce')
+    df_out['expiry'] = pd.to_datetime(df_out['expiry'], format="%d %b %Y", errors='coerce')
+    return df_out
+
+
+def box_pnl(df):
+    """Paired boxes with ``pnl`` and ``date``/``expiry`` as datetimes (empty frame if no boxes)."""
+    return _with_pnl(pair_box_trades(df))
+
+
+def trade_log_pnl(source, chunksize=CHUNK_ROWS):
+    """``box_pnl`` of a trade log, streamed ``chunksize`` rows at a time.
+
+    Only the small per-leg totals of each chunk are kept, so memory stays
+    bounded however large the log is.
+    """
+    parts = (leg_totals(chunk) for chunk in read_trade_log(source, chunksize=chunksize))
+    return _with_pnl(pair_legs(*combine_leg_totals(parts)))
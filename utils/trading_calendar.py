@@ -0,0 +1,67 @@
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+_lock = threading.Lock()
+_days = None       # sorted datetime64[D] array of NSE sessions
+_day_set = None    # same sessions as a set of datetime.date for O(1) lookups
+_bounds = None     # (first, last) dates covered by the index
+
+
+# -------------------------
+# Helper: process-wide NSE session index
+# -------------------------
+def _build(start, end):
+    import pandas_market_calendars as mcal
+    schedule = mcal.get_calendar("NSE").schedule(start_date=start, end_date=end)
+    return schedule.index.values.astype("datetime64[D]")
+
+
+def _ensure(start, end):
+    global _days, _day_set, _bounds
+    if _bounds is not None and _bounds[0] <= start and end <= _bounds[1]:
+        return
+    with _lock:
+        if _bounds is not None and _bounds[0] <= start and end <= _bounds[1]:
+            return
+        lo = min(start, datetime.date(2010, 1, 1))
+        hi = max(end, datetime.date(datetime.date.today().year + 1, 12, 31))
+        if _bounds is not None:
+            lo, hi = min(lo, _bounds[0]), max(hi, _bounds[1])
+        days = _build(lo, hi)
+        _day_set = set(days.astype(object))
+        _days = days
+        _bounds = (lo, hi)
+
+
+def _to_date(date):
+    return pd.Timestamp(date).date()
+
+
+def is_trading_day(date):
+    """True if NSE was (or is scheduled to be) open on ``date``."""
+    date = _to_date(date)
+    _ensure(date, date)
+    return date in _day_set
+
+
+def trading_days(start, end):
+    """All NSE sessions between ``start`` and ``end`` inclusive, as a DatetimeIndex."""
+    start, end = _to_date(start), _to_date(end)
+    if end < start:
+        return pd.DatetimeIndex([])
+    _ensure(start, end)
+    lo = np.searchsorted(_days, np.datetime64(start), side="left")
+    hi = np.searchsorted(_days, np.datetime64(end), side="right")
+    return pd.DatetimeIndex(_days[lo:hi])
+
+
+def previous_trading_day(date):
+    """The last NSE session strictly before ``date``."""
+    date = _to_date(date)
+    _ensure(date - datetime.timedelta(days=30), date)
+    i = np.searchsorted(_days, np.datetime64(date), side="left")
+    return pd.Timestamp(_days[i - 1]).date() if i else None
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.atomic_write import write_text_atomic
+
+
+DEFAULT_SNAPSHOT = Path(os.environ.get(
+    "FNO_UNIVERSE_SNAPSHOT", Path(__file__).resolve().parent.parent / ".cache" / "fno_universe.json"
+))
+DEFAULT_TTL = 6 * 60 * 60  # the F&O list changes a few times a year
+
+
+def nse_fno_symbols():
+    from nselib import capital_market
+    return list(capital_market.fno_equity_list()["symbol"])
+
+
+# -------------------------
+# Helper: F&O symbol universe
+# -------------------------
+class UniverseProvider:
+    """F&O symbol list with a TTL memory cache, a disk snapshot and background refresh.
+
+    Only the very first start without a snapshot waits for NSE.  After that
+    a stale list is served immediately while a single background thread
+    fetches the new one, and a failed refresh keeps the last good list.
+    """
+
+    def __init__(self, fetcher=nse_fno_symbols, snapshot=DEFAULT_SNAPSHOT, ttl=DEFAULT_TTL):
+        self.fetcher = fetcher
+        self.snapshot = Path(snapshot)
+        self.ttl = ttl
+        self._symbols = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.last_error = None
+
+    def _load_snapshot(self):
+        try:
+            payload = json.loads(self.snapshot.read_text(encoding="utf-8"))
+            return payload["symbols"], payload["fetched_at"]
+        except (OSError, ValueError, KeyError):
+            return None, 0.0
+
+    def _save_snapshot(self, symbols, fetched_at):
+        write_text_atomic(self.snapshot, json.dumps({"fetched_at": fetched_at, "symbols": symbols}))
+
+    def refresh(self):
+        try:
+            symbols = list(self.fetcher())
+        except Exception as e:
+            self.last_error = e
+            return False
+        if not symbols:
+            return False
+        fetched_at = time.time()
+        with self._lock:
+            self._symbols, self._fetched_at = symbols, fetched_at
+        self.last_error = None
+        try:
+            self._save_snapshot(symbols, fetched_at)
+        except OSError:
+            pass
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="fno-universe-refresh", daemon=True).start()
+
+    def symbols(self):
+        if self._symbols is None:
+            with self._lock:
+                if self._symbols is None:
+                    self._symbols, self._fetched_at = self._load_snapshot()
+        if self._symbols is None:
+            # Cold start without a snapshot: nothing to serve yet
+            if not self.refresh():
+                raise RuntimeError(f"Could not load the F&O symbol list: {self.last_error}")
+        elif time.time() - self._fetched_at > self.ttl:
+            self._refresh_in_background()
+        return list(self._symbols)
+
+
+_default_provider = None
+
+
+def get_fno_symbols():
+    """F&O equity symbols through the shared process-wide provider."""
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = UniverseProvider()
+    return _default_provider.symbols()